@@ -1,29 +1,262 @@
 import sqlite3
 import os
+import json
+import itertools
+import logging
+import re
 import sys
-from datetime import datetime
+import tempfile
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime
 from barcode import BarcodeManager
 
+# Stored in PRAGMA user_version once init_database has brought a database up to date.
+# Bump it whenever expected_schema, indexes or triggers change so existing databases migrate.
+SCHEMA_VERSION = 2
+
+# Hot-path queries live at module level so every call passes the identical SQL
+# string and hits the connection's prepared-statement cache
+# Product listings walk idx_products_date_mixed_id in order (no sort step); the flag is an EXISTS probe per row
+_SQL_PRODUCTS_LISTING = '''
+	SELECT p.id, p.barcode_id, p.product_name, p.batch_number, p.date_mixed, 
+	       p.total_quantity, p.total_cost, p.amount, p.notes,
+	       EXISTS (
+	           SELECT 1 FROM product_ingredients pi
+	           JOIN ingredients i ON i.id = pi.ingredient_id
+	           WHERE pi.product_id = p.id AND i.is_flagged = 1
+	       ) AS has_flagged_ingredients
+	FROM products p
+	{where}
+	ORDER BY p.date_mixed DESC, p.id DESC
+'''
+_SQL_GET_PRODUCTS = _SQL_PRODUCTS_LISTING.format(where='')
+_SQL_GET_PRODUCTS_PAGE = _SQL_GET_PRODUCTS + ' LIMIT ? OFFSET ?'
+_SQL_GET_PRODUCTS_KEYSET_FIRST = _SQL_GET_PRODUCTS + ' LIMIT ?'
+_SQL_GET_PRODUCTS_KEYSET_AFTER = _SQL_PRODUCTS_LISTING.format(where='WHERE (p.date_mixed, p.id) < (?, ?)') + ' LIMIT ?'
+
+_SQL_GET_PRODUCT_INGREDIENTS = '''
+	SELECT 
+		i.id, i.barcode_id, i.name, i.purchase_date, i.expiration_date, i.supplier, i.is_flagged,
+		pi.quantity_used, pi.cost_per_unit,
+		(pi.quantity_used * pi.cost_per_unit) as total_ingredient_cost
+	FROM ingredients i
+	JOIN product_ingredients pi ON i.id = pi.ingredient_id
+	WHERE pi.product_id = ?
+	ORDER BY i.name
+'''
+
+# Products (newest first, limited before the join) with one row per ingredient; ing_ columns are the
+# same fields get_product_ingredients returns. LIMIT -1 means no limit.
+_SQL_GET_PRODUCTS_WITH_INGREDIENTS = '''
+	SELECT p.id, p.barcode_id, p.product_name, p.batch_number, p.date_mixed, 
+	       p.total_quantity, p.total_cost, p.amount, p.notes,
+	       i.id AS ing_id, i.barcode_id AS ing_barcode_id, i.name AS ing_name,
+	       i.purchase_date AS ing_purchase_date, i.expiration_date AS ing_expiration_date,
+	       i.supplier AS ing_supplier, i.is_flagged AS ing_is_flagged,
+	       pi.quantity_used AS ing_quantity_used, pi.cost_per_unit AS ing_cost_per_unit,
+	       (pi.quantity_used * pi.cost_per_unit) AS ing_total_ingredient_cost
+	FROM (
+		SELECT * FROM products
+		ORDER BY date_mixed DESC, id DESC
+		LIMIT ?
+	) p
+	LEFT JOIN product_ingredients pi ON pi.product_id = p.id
+	LEFT JOIN ingredients i ON i.id = pi.ingredient_id
+	ORDER BY p.date_mixed DESC, p.id DESC, i.name
+'''
+
+# One row per product (same order and LIMIT convention as above) with its ingredients pre-aggregated
+_SQL_GET_PRODUCTS_WITH_INGREDIENT_SUMMARY = '''
+	SELECT p.id, p.barcode_id, p.product_name, p.batch_number, p.date_mixed, 
+	       p.total_quantity, p.total_cost, p.amount, p.notes,
+	       GROUP_CONCAT(i.name, ', ') AS ingredient_names,
+	       COUNT(pi.id) AS ingredient_count,
+	       COALESCE(SUM(i.is_flagged = 1), 0) AS flagged_count
+	FROM (
+		SELECT * FROM products
+		ORDER BY date_mixed DESC, id DESC
+		LIMIT ?
+	) p
+	LEFT JOIN product_ingredients pi ON pi.product_id = p.id
+	LEFT JOIN ingredients i ON i.id = pi.ingredient_id
+	GROUP BY p.id
+	ORDER BY p.date_mixed DESC, p.id DESC
+'''
+
+_SQL_GET_PRODUCT_BY_ID = '''
+	SELECT id, barcode_id, product_name, batch_number, date_mixed, 
+	       total_quantity, total_cost, amount, notes
+	FROM products 
+	WHERE id = ?
+'''
+
+_SQL_GET_INGREDIENT_BY_ID = '''
+	SELECT id, barcode_id, name, unit_cost, supplier,
+	       purchase_date, expiration_date, is_flagged
+	FROM ingredients 
+	WHERE id = ?
+'''
+
+_SQL_GET_FLAGGED_INGREDIENTS = 'SELECT id, name FROM ingredients WHERE is_flagged = 1'
+
+# Stops at the first flagged ingredient instead of counting them all
+_SQL_PRODUCT_HAS_FLAGGED_INGREDIENT = '''
+	SELECT 1
+	FROM product_ingredients pi
+	JOIN ingredients i ON i.id = pi.ingredient_id
+	WHERE pi.product_id = ? AND i.is_flagged = 1
+	LIMIT 1
+'''
+
+_SQL_SEARCH_INGREDIENT_BY_BARCODE = '''
+	SELECT id, barcode_id, name, unit_cost, 
+	       purchase_date, expiration_date, supplier, is_flagged
+	FROM ingredients 
+	WHERE barcode_id = ?
+'''
+
+_SQL_RECOMPUTE_PRODUCT_TOTALS = '''
+	UPDATE products
+	SET total_cost = (
+	        SELECT COALESCE(SUM(pi.quantity_used * pi.cost_per_unit), 0)
+	        FROM product_ingredients pi
+	        WHERE pi.product_id = products.id
+	    ),
+	    total_quantity = (
+	        SELECT COALESCE(SUM(pi.quantity_used), 0)
+	        FROM product_ingredients pi
+	        WHERE pi.product_id = products.id
+	    )
+'''
+_SQL_RECOMPUTE_PRODUCT_TOTALS_ONE = _SQL_RECOMPUTE_PRODUCT_TOTALS + ' WHERE id = ?'
+
+# Matches nothing when the flag already has the requested value, so no page is dirtied
+_SQL_SET_INGREDIENT_FLAG = '''
+	UPDATE ingredients 
+	SET is_flagged = ?, last_updated = unixepoch() 
+	WHERE id = ? AND is_flagged <> ?
+'''
+
+
+# Every SQL statement is sent here in development runs; enable DEBUG logging to see them
+_sql_logger = logging.getLogger(__name__ + '.sql')
+# Query plan checks report here (DEBUG), also only in development runs
+_plan_logger = logging.getLogger(__name__ + '.plans')
+
+# Queries that must stay on a given index; checked at startup in development runs
+# (only once products has this many rows: on smaller tables a scan is the planner's right call)
+_QUERY_PLAN_CHECK_MIN_ROWS = 1000
+_EXPECTED_QUERY_PLANS = [
+	(_SQL_GET_PRODUCTS, (), 'idx_products_date_mixed_id'),
+	(_SQL_GET_PRODUCTS_PAGE, (50, 0), 'idx_products_date_mixed_id'),
+	(_SQL_GET_PRODUCTS_KEYSET_AFTER, ('', 0, 50), 'idx_products_date_mixed_id'),
+]
+
+
+# (description, field names) of the last result set; a cursor hands every row the same description object
+_row_fields = (None, ())
+
+
+def _dict_factory(cursor, row):
+	"""Build plain dicts straight from the cursor so results can be returned to the JS API as-is"""
+	global _row_fields
+	description, fields = _row_fields
+	if cursor.description is not description:
+		description = cursor.description
+		fields = tuple(column[0] for column in description)
+		_row_fields = (description, fields)
+	return dict(zip(fields, row))
+
+
+# SQLite's default SQLITE_MAX_VARIABLE_NUMBER on older builds; multi-row statements stay under it
+_MAX_SQL_VARIABLES = 999
+# Below this many rows executemany is just as fast as a multi-row VALUES statement
+_MULTI_INSERT_MIN_ROWS = 10
+
+
+def _multi_insert(conn, sql_prefix, placeholder, rows):
+	"""Insert rows as multi-row 'VALUES (...),(...)' statements, chunked under the bound-variable limit"""
+	if len(rows) < _MULTI_INSERT_MIN_ROWS:
+		conn.executemany(sql_prefix + placeholder, rows)
+		return
+	
+	chunk_size = _MAX_SQL_VARIABLES // len(rows[0])
+	for start in range(0, len(rows), chunk_size):
+		chunk = rows[start:start + chunk_size]
+		values_sql = ','.join([placeholder] * len(chunk))
+		conn.execute(sql_prefix + values_sql, [value for row in chunk for value in row])
+
+
+@contextmanager
+def _transaction(conn, begin="BEGIN"):
+	"""Run a block in a transaction on an autocommit-mode connection, committed on success and rolled back on error"""
+	conn.execute(begin)
+	try:
+		yield conn
+	except BaseException:
+		# SQLite rolls back by itself on some errors (e.g. SQLITE_FULL); a second ROLLBACK would mask the original error
+		if conn.in_transaction:
+			conn.execute("ROLLBACK")
+		raise
+	conn.execute("COMMIT")
+
+
+def _coerce_to_column_type(value, column_type):
+	"""Convert a value from a pre-STRICT table to a STRICT column's type; None if it has no sensible conversion"""
+	if value is None or column_type not in ('INTEGER', 'REAL'):
+		return value
+	if isinstance(value, str):
+		try:
+			value = float(value.strip())
+		except ValueError:
+			return None
+	elif not isinstance(value, (int, float)):
+		return None
+	if column_type == 'REAL':
+		return float(value)
+	return int(value) if isinstance(value, int) else round(value)
+
+
+# Numeric DEFAULT of a column definition, used in place of a legacy value that doesn't convert
+_NUMERIC_DEFAULT_RE = re.compile(r'\bDEFAULT\s+(-?\d+(?:\.\d+)?)\b', re.IGNORECASE)
+
+
+# Set by the first get_data_path() call
+_DATA_PATH = None
+
 
 def get_data_path():
-	"""Get writable data directory for the database"""
-	if getattr(sys, 'frozen', False):
-		# Running as compiled executable
-		# Use user's AppData directory for writable database
-		import tempfile
-		app_data = os.path.join(os.environ.get('APPDATA', tempfile.gettempdir()), 'InventorySystem')
-		os.makedirs(app_data, exist_ok=True)
-		return app_data
-	else:
-		# Running as Python script
-		return os.path.join(os.path.dirname(__file__), "data")
+	"""Get writable data directory for the database (resolved, and created, once per process)"""
+	global _DATA_PATH
+	if _DATA_PATH is None:
+		if getattr(sys, 'frozen', False):
+			# Running as compiled executable
+			# Use user's AppData directory for writable database
+			_DATA_PATH = os.path.join(os.environ.get('APPDATA', tempfile.gettempdir()), 'InventorySystem')
+			os.makedirs(_DATA_PATH, exist_ok=True)
+		else:
+			# Running as Python script
+			_DATA_PATH = os.path.join(os.path.dirname(__file__), "data")
+	return _DATA_PATH
 
 
 class DatabaseManager:
 	def __init__(self, app_version="0.2.0"):
 		self.app_version = app_version
-		self.db_path = os.path.join(get_data_path(), "inventory.db")
+		# Resolve the data folder once; everything else reuses these paths
+		self._data_dir = get_data_path()
+		os.makedirs(self._data_dir, exist_ok=True)
+		self.db_path = os.path.join(self._data_dir, "inventory.db")
 		self.barcode_manager = BarcodeManager()
+		# Bumped on every ingredient write; get_all_ingredients caches per version
+		self._ingredients_version = 0
+		# (version, rows) from the last get_all_ingredients query
+		self._ingredients_cache = (None, ())
+		# Ingredient names by barcode for label printing, kept in step by the ingredient writers
+		self._name_cache = {}
+		# Set by init_database once the ingredients_fts index is known to exist
+		self.fts_enabled = False
 		
 		# Define expected schema for all tables
 		self.expected_schema = {
@@ -32,23 +265,23 @@ class DatabaseManager:
 				('barcode_id', 'TEXT UNIQUE NOT NULL'),
 				('name', 'TEXT NOT NULL'),
 				('unit_cost', 'REAL DEFAULT 0.0'),
-				('purchase_date', 'DATE'),
-				('expiration_date', 'DATE'),
+				('purchase_date', 'TEXT'),
+				('expiration_date', 'TEXT'),
 				('supplier', 'TEXT'),
 				('is_flagged', 'INTEGER DEFAULT 0'),
-				('last_updated', 'DATETIME DEFAULT CURRENT_TIMESTAMP')
+				('last_updated', 'INTEGER DEFAULT (unixepoch())')
 			],
 			'products': [
 				('id', 'INTEGER PRIMARY KEY AUTOINCREMENT'),
 				('barcode_id', 'TEXT UNIQUE NOT NULL'),
 				('product_name', 'TEXT NOT NULL'),
 				('batch_number', 'TEXT'),
-				('date_mixed', 'DATE NOT NULL'),
+				('date_mixed', 'TEXT NOT NULL'),
 				('total_quantity', 'REAL DEFAULT 0.0'),
 				('total_cost', 'REAL DEFAULT 0.0'),
 				('amount', 'INTEGER DEFAULT 0'),
 				('notes', 'TEXT'),
-				('last_updated', 'DATETIME DEFAULT CURRENT_TIMESTAMP')
+				('last_updated', 'INTEGER DEFAULT (unixepoch())')
 			],
 			'product_ingredients': [
 				('id', 'INTEGER PRIMARY KEY AUTOINCREMENT'),
@@ -62,8 +295,8 @@ class DatabaseManager:
 				('name', 'TEXT NOT NULL'),
 				('display_order', 'INTEGER DEFAULT 0'),
 				('is_collapsed', 'INTEGER DEFAULT 0'),
-				('created_at', 'DATETIME DEFAULT CURRENT_TIMESTAMP'),
-				('last_updated', 'DATETIME DEFAULT CURRENT_TIMESTAMP')
+				('created_at', 'TEXT DEFAULT CURRENT_TIMESTAMP'),
+				('last_updated', 'INTEGER DEFAULT (unixepoch())')
 			],
 			'group_products': [
 				('id', 'INTEGER PRIMARY KEY AUTOINCREMENT'),
@@ -76,39 +309,80 @@ class DatabaseManager:
 				('group_id', 'INTEGER NOT NULL'),
 				('name', 'TEXT NOT NULL'),
 				('display_order', 'INTEGER DEFAULT 0'),
-				('created_at', 'DATETIME DEFAULT CURRENT_TIMESTAMP')
+				('created_at', 'TEXT DEFAULT CURRENT_TIMESTAMP')
 			],
 			'product_group_parameter_values': [
 				('id', 'INTEGER PRIMARY KEY AUTOINCREMENT'),
 				('product_id', 'INTEGER NOT NULL'),
 				('group_parameter_id', 'INTEGER NOT NULL'),
 				('value', 'TEXT'),
-				('last_updated', 'DATETIME DEFAULT CURRENT_TIMESTAMP')
+				('last_updated', 'INTEGER DEFAULT (unixepoch())')
 			],
 			'inventory_events': [
 				('id', 'INTEGER PRIMARY KEY AUTOINCREMENT'),
 				('product_id', 'INTEGER NOT NULL'),
 				('delta', 'INTEGER NOT NULL'),
 				('event_title', 'TEXT'),
-				('event_date', 'DATE DEFAULT CURRENT_DATE'),
-				('created_at', 'DATETIME DEFAULT CURRENT_TIMESTAMP')
+				('event_date', 'TEXT DEFAULT CURRENT_DATE'),
+				('created_at', 'TEXT DEFAULT CURRENT_TIMESTAMP')
 			]
 		}
 		
 		self.init_database()
+		
+		# One long-lived connection shared by every js_api call (pywebview dispatches them on
+		# worker threads); the lock serializes access so each call sees a consistent transaction
+		self._lock = threading.RLock()
+		self._conn = self._open_connection()
 
-	def _get_db_connection(self):
-		"""Get database connection with row factory"""
-		conn = sqlite3.connect(self.db_path)
-		conn.row_factory = sqlite3.Row
+	def _open_connection(self):
+		"""Open and configure the shared database connection"""
+		# Autocommit mode: _get_db_connection issues BEGIN/COMMIT itself
+		conn = sqlite3.connect(self.db_path, isolation_level=None, cached_statements=256, check_same_thread=False)
+		conn.row_factory = _dict_factory
+		# Per-connection settings in one call (journal_mode=WAL is persistent and set by init_database).
+		# NORMAL sync is safe under WAL; foreign keys are off by default and ON DELETE CASCADE relies on them;
+		# busy_timeout waits for a competing writer instead of failing immediately with SQLITE_BUSY.
+		conn.executescript('''
+			PRAGMA synchronous=NORMAL;
+			PRAGMA temp_store=MEMORY;
+			PRAGMA mmap_size=268435456;
+			PRAGMA cache_size=-40000;
+			PRAGMA foreign_keys=ON;
+			PRAGMA busy_timeout=5000;
+		''')
+		
+		if not getattr(sys, 'frozen', False):
+			conn.set_trace_callback(_sql_logger.debug)
+		
 		return conn
+	
+	@contextmanager
+	def _get_db_connection(self, begin="BEGIN"):
+		"""Hold the shared connection for a block, inside a transaction committed on success and rolled back on error"""
+		with self._lock:
+			conn = self._conn
+			if conn.in_transaction:
+				# Nested use from inside another block joins the outer transaction
+				yield conn
+				return
+			
+			with _transaction(conn, begin):
+				yield conn
+
+	def _tx(self):
+		"""Like _get_db_connection, but takes SQLite's write lock up front; use for every method that writes"""
+		# A deferred read lock that later upgrades can fail with SQLITE_BUSY instead of waiting on busy_timeout
+		return self._get_db_connection("BEGIN IMMEDIATE")
 
 	def _parse_date(self, date_str, default=None):
 		"""Parse date string or return default"""
 		if not date_str:
 			return default
+		if isinstance(date_str, date):
+			return date_str
 		try:
-			return datetime.strptime(date_str, "%Y-%m-%d").date()
+			return date.fromisoformat(date_str)
 		except (ValueError, TypeError):
 			return default
 
@@ -147,64 +421,110 @@ class DatabaseManager:
 		"""Generate a simple unique barcode for products"""
 		return self.barcode_manager.generate_product_barcode()
 	
-	def generate_batch_number(self):
-		"""Generate a batch number using barcode manager"""
-		import random
-		return f"BATCH{random.randint(1000, 9999)}"
+	def _invalidate_ingredient_caches(self):
+		"""Drop cached ingredient reads after any ingredient write"""
+		self._ingredients_version += 1
 	
-	def generate_barcode_pdf(self, barcode_id):
+	def _name_for_barcode(self, barcode_id):
+		"""Look up an ingredient name by barcode, from the name cache when possible"""
+		name = self._name_cache.get(barcode_id)
+		if name is None:
+			with self._get_db_connection() as conn:
+				result = conn.execute('SELECT name FROM ingredients WHERE barcode_id = ?', (barcode_id,)).fetchone()
+				# Store while still holding the lock the writers invalidate under, so a rename that
+				# lands between the read and the store can't be overwritten with the old name
+				if result:
+					name = self._name_cache[barcode_id] = result['name']
+		return name
+	
+	def generate_barcode_pdf(self, barcode_id, ingredient_name=None):
 		"""Generate a PDF file with a printable barcode optimized for 1.5" x 1" labels (PLS198)"""
-		# Look up the ingredient name from the database
-		ingredient_name = "Unknown Ingredient"
-		with self._get_db_connection() as conn:
-			cursor = conn.execute('SELECT name FROM ingredients WHERE barcode_id = ?', (barcode_id,))
-			result = cursor.fetchone()
-			if result:
-				ingredient_name = result['name']
-		
+		# Only hit the database when the caller didn't already know the name
+		if ingredient_name is None:
+			ingredient_name = self._name_for_barcode(barcode_id) or "Unknown Ingredient"
 		return self.barcode_manager.generate_barcode_pdf(barcode_id, ingredient_name)
 	
 	def init_database(self):
-		# Create data folder if it doesn't exist
-		data_dir = get_data_path()
-		if not os.path.exists(data_dir):
-			os.makedirs(data_dir)
+		db_path = self.db_path
+		
+		# Initialize database and create/migrate tables dynamically.
+		# Everything runs in one transaction so the DDL commits (and syncs) once;
+		# foreign keys stay off so rebuilding a parent table doesn't cascade into its children.
+		# Don't use executescript here: it COMMITs the open transaction before running.
+		conn = sqlite3.connect(db_path, isolation_level=None)
+		# WAL lets readers and the writer proceed concurrently; the mode is stored in the file, so set it once here
+		conn.execute("PRAGMA journal_mode=WAL")
 		
-		db_path = os.path.join(data_dir, "inventory.db")
+		# Schema already current: skip the migration entirely
+		if conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION:
+			self.fts_enabled = conn.execute(
+				"SELECT 1 FROM sqlite_master WHERE type='table' AND name='ingredients_fts'"
+			).fetchone() is not None
+			return db_path
 		
-		# Initialize database and create/migrate tables dynamically
-		with sqlite3.connect(db_path) as conn:
+		# Take the write lock up front so a deferred read lock never has to upgrade
+		with conn, _transaction(conn, "BEGIN IMMEDIATE"):
 			# Drop old inventory table if it exists (legacy)
 			conn.execute('DROP TABLE IF EXISTS inventory')
 			
 			# Migrate all tables to match expected schema
+			migrated_tables = set()
 			for table_name, expected_columns in self.expected_schema.items():
-				self._migrate_table_schema(conn, table_name, expected_columns)
+				if self._migrate_table_schema(conn, table_name, expected_columns):
+					migrated_tables.add(table_name)
 			
 			# Create indexes for better performance
 			self._create_indexes(conn)
 			
-			conn.commit()
+			# Full-text index over ingredient names; rebuilt whenever ingredients was rebuilt
+			self.fts_enabled = self._create_fts_index(conn, rebuild='ingredients' in migrated_tables)
+			
+			# Rebuilt cost tables may have dropped or retyped columns; re-derive product totals
+			if migrated_tables & {'products', 'product_ingredients'}:
+				self._recompute_product_totals(conn)
+			
+			# Refresh planner statistics so the query planner picks up the indexes
+			conn.execute('ANALYZE')
+			
+			if not getattr(sys, 'frozen', False):
+				self._check_query_plans(conn)
+			
+			# Committed together with the migration, so a failed migration is retried next start
+			conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
 		
 		return db_path
 	
+	def _check_query_plans(self, conn):
+		"""Log when a hot query stops using the index it was written for (development runs only)"""
+		if not _plan_logger.isEnabledFor(logging.DEBUG):
+			return
+		row_count = conn.execute("SELECT COUNT(*) FROM products").fetchone()[0]
+		if row_count < _QUERY_PLAN_CHECK_MIN_ROWS:
+			return
+		
+		for sql, params, index_name in _EXPECTED_QUERY_PLANS:
+			plan = ' | '.join(row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params))
+			if index_name not in plan:
+				_plan_logger.debug("Query no longer uses %s: %s", index_name, plan)
+	
 	def _migrate_table_schema(self, conn, table_name, expected_columns):
 		"""
 		Dynamically migrate a table to match the expected schema.
 		Adds missing columns and removes columns not in the schema.
+		Returns True if an existing table was rebuilt.
 		"""
 		# Check if table exists
 		cursor = conn.execute(
-			"SELECT name FROM sqlite_master WHERE type='table' AND name=?",
+			"SELECT sql FROM sqlite_master WHERE type='table' AND name=?",
 			(table_name,)
 		)
-		table_exists = cursor.fetchone() is not None
+		table_row = cursor.fetchone()
 		
-		if not table_exists:
+		if table_row is None:
 			# Create table from scratch
 			print(f"Creating new table: {table_name}")
 			self._create_table(conn, table_name, expected_columns)
-			return
+			return False
 		
 		# Get current columns
 		cursor = conn.execute(f"PRAGMA table_info({table_name})")
@@ -217,22 +537,67 @@ class DatabaseManager:
 		columns_to_add = expected_column_names - current_column_names
 		columns_to_remove = current_column_names - expected_column_names
 		
-		if not columns_to_add and not columns_to_remove:
+		# Find columns whose declared type changed (e.g. DATETIME -> INTEGER)
+		columns_to_retype = {
+			col[0] for col in expected_columns
+			if col[0] in current_columns and current_columns[col[0]].upper() != self._declared_type(col[1])
+		}
+		
+		# Tables created before STRICT typing was introduced need a rebuild too
+		needs_strict = not table_row[0].rstrip().upper().endswith('STRICT')
+		
+		if not columns_to_add and not columns_to_remove and not columns_to_retype and not needs_strict:
 			# Schema matches, no migration needed
-			return
+			return False
 		
 		print(f"Migrating table: {table_name}")
 		if columns_to_add:
 			print(f"  Adding columns: {', '.join(columns_to_add)}")
 		if columns_to_remove:
 			print(f"  Removing columns: {', '.join(columns_to_remove)}")
+		if columns_to_retype:
+			print(f"  Changing column types: {', '.join(columns_to_retype)}")
+		if needs_strict:
+			print("  Converting to STRICT table")
 		
 		# SQLite doesn't support DROP COLUMN directly until 3.35.0
 		# We need to recreate the table
 		self._recreate_table(conn, table_name, expected_columns, current_columns)
+		return True
+	
+	def _declared_type(self, column_definition):
+		"""Return the declared type of a column definition, as PRAGMA table_info reports it"""
+		return column_definition.split()[0].upper()
+	
+	def _copy_expression(self, column, old_type, new_type):
+		"""SQL expression that carries an old column value over to its new type"""
+		if new_type == 'INTEGER' and old_type.upper() in ('DATE', 'DATETIME'):
+			# Text timestamps become unix epoch seconds
+			return f"CASE WHEN typeof({column}) = 'text' THEN unixepoch({column}) ELSE {column} END"
+		return column
 	
-	def _create_table(self, conn, table_name, columns):
-		"""Create a new table with the specified columns"""
+	def _strict_copy_expression(self, expression, column_definition):
+		"""Wrap a copy expression so the value fits the column's STRICT type (every row is kept; a value
+		that doesn't convert, like '' in a REAL column, becomes the column's default, 0 if NOT NULL, else NULL)"""
+		column_type = self._declared_type(column_definition)
+		if column_type not in ('INTEGER', 'REAL'):
+			return expression
+		
+		converted = f"_migrate_value({expression}, '{column_type}')"
+		default = _NUMERIC_DEFAULT_RE.search(column_definition)
+		if default:
+			fallback = default.group(1)
+		elif 'NOT NULL' in column_definition.upper():
+			fallback = '0'
+		else:
+			return converted
+		# NULLs stay NULL; only values that failed to convert take the fallback
+		return f"COALESCE({converted}, CASE WHEN {expression} IS NULL THEN NULL ELSE {fallback} END)"
+	
+	def _create_table(self, conn, table_name, columns, create_as=None):
+		"""Create a new table with the specified columns.
+		table_name picks the table's constraints; create_as, if given, is the name it's created under
+		(a rebuild creates '<table>_new' with the constraints of <table>)"""
 		column_defs = [f"{col[0]} {col[1]}" for col in columns]
 		
 		# Add foreign key constraints for specific tables
@@ -254,7 +619,8 @@ class DatabaseManager:
 			constraints.append('UNIQUE(product_id, group_parameter_id)')
 		
 		all_defs = column_defs + constraints
-		create_sql = f"CREATE TABLE {table_name} ({', '.join(all_defs)})"
+		# STRICT enforces the declared column types instead of per-value type affinity
+		create_sql = f"CREATE TABLE {create_as or table_name} ({', '.join(all_defs)}) STRICT"
 		conn.execute(create_sql)
 	
 	def _recreate_table(self, conn, table_name, expected_columns, current_columns):
@@ -264,7 +630,7 @@ class DatabaseManager:
 		"""
 		# Create temporary table with new schema
 		temp_table_name = f"{table_name}_new"
-		self._create_table(conn, temp_table_name, expected_columns)
+		self._create_table(conn, table_name, expected_columns, create_as=temp_table_name)
 		
 		# Find columns that exist in both schemas
 		expected_column_names = {col[0] for col in expected_columns}
@@ -273,47 +639,51 @@ class DatabaseManager:
 		
 		if common_columns:
 			# Copy data from old table to new table (only common columns)
+			common_columns = sorted(common_columns)
+			expected_defs = dict(expected_columns)
+			select_exprs = [
+				self._strict_copy_expression(
+					self._copy_expression(col, current_columns[col], self._declared_type(expected_defs[col])),
+					expected_defs[col]
+				)
+				for col in common_columns
+			]
+			
+			# Old tables took any value in any column; count the ones STRICT can't store as-is
+			unconverted = [0]
+			
+			def migrate_value(value, column_type):
+				converted = _coerce_to_column_type(value, column_type)
+				if converted is None and value is not None:
+					unconverted[0] += 1
+				return converted
+			
+			conn.create_function('_migrate_value', 2, migrate_value, deterministic=True)
 			common_cols_str = ', '.join(common_columns)
+			select_str = ', '.join(select_exprs)
 			copy_sql = f"""
 				INSERT INTO {temp_table_name} ({common_cols_str})
-				SELECT {common_cols_str}
+				SELECT {select_str}
 				FROM {table_name}
 			"""
-			try:
-				conn.execute(copy_sql)
-			except sqlite3.Error as e:
-				print(f"  Warning: Could not copy all data from {table_name}: {e}")
-				print(f"  Attempting to copy row by row...")
-				# Try copying row by row to handle type mismatches
-				self._copy_data_safe(conn, table_name, temp_table_name, common_columns)
+			conn.execute(copy_sql)
+			if unconverted[0]:
+				print(f"  Reset {unconverted[0]} non-numeric value(s) in numeric columns to their defaults")
 		
 		# Drop old table and rename new table
 		conn.execute(f"DROP TABLE {table_name}")
 		conn.execute(f"ALTER TABLE {temp_table_name} RENAME TO {table_name}")
 	
-	def _copy_data_safe(self, conn, old_table, new_table, common_columns):
-		"""Safely copy data row by row, handling type conversions"""
-		common_cols_str = ', '.join(common_columns)
-		placeholders = ', '.join(['?' for _ in common_columns])
-		
-		cursor = conn.execute(f"SELECT {common_cols_str} FROM {old_table}")
-		insert_sql = f"INSERT INTO {new_table} ({common_cols_str}) VALUES ({placeholders})"
-		
-		for row in cursor:
-			try:
-				conn.execute(insert_sql, row)
-			except sqlite3.Error as e:
-				print(f"    Skipping row due to error: {e}")
-				continue
-	
 	def _create_indexes(self, conn):
 		"""Create indexes for better performance"""
 		indexes = [
 			'CREATE INDEX IF NOT EXISTS idx_ingredients_barcode ON ingredients(barcode_id)',
+			'CREATE INDEX IF NOT EXISTS idx_ingredients_flagged ON ingredients(id, name) WHERE is_flagged = 1',
 			'CREATE INDEX IF NOT EXISTS idx_products_barcode ON products(barcode_id)',
-			'CREATE INDEX IF NOT EXISTS idx_products_date_mixed ON products(date_mixed)',
-			'CREATE INDEX IF NOT EXISTS idx_product_ingredients_product ON product_ingredients(product_id)',
-			'CREATE INDEX IF NOT EXISTS idx_product_ingredients_ingredient ON product_ingredients(ingredient_id)',
+			'CREATE INDEX IF NOT EXISTS idx_products_date_mixed_id ON products(date_mixed DESC, id DESC)',
+			'CREATE INDEX IF NOT EXISTS idx_products_batch_seq ON products(CAST(SUBSTR(batch_number, 6) AS INTEGER))',
+			'CREATE INDEX IF NOT EXISTS idx_pi_product_ingredient ON product_ingredients(product_id, ingredient_id, quantity_used, cost_per_unit)',
+			'CREATE INDEX IF NOT EXISTS idx_pi_ing_prod ON product_ingredients(ingredient_id, product_id)',
 			'CREATE INDEX IF NOT EXISTS idx_groups_order ON groups(display_order)',
 			'CREATE INDEX IF NOT EXISTS idx_group_products_group ON group_products(group_id)',
 			'CREATE INDEX IF NOT EXISTS idx_group_products_product ON group_products(product_id)',
@@ -322,132 +692,238 @@ class DatabaseManager:
 			'CREATE INDEX IF NOT EXISTS idx_product_param_values_parameter ON product_group_parameter_values(group_parameter_id)'
 		]
 		
+		# Indexes superseded by the ones above
+		obsolete_indexes = [
+			'idx_products_date_mixed',
+			'idx_product_ingredients_product',
+			'idx_product_ingredients_ingredient'
+		]
+		
+		for index_name in obsolete_indexes:
+			conn.execute(f'DROP INDEX IF EXISTS {index_name}')
+		
 		for index_sql in indexes:
 			try:
 				conn.execute(index_sql)
 			except sqlite3.OperationalError as e:
 				print(f"Index creation failed for: {index_sql} -> {e}")
 	
-	def get_products_data(self):
-		"""Get all products ordered by date_mixed (newest first)"""
-		with self._get_db_connection() as conn:
-			cursor = conn.execute('''
-				SELECT id, barcode_id, product_name, batch_number, date_mixed, 
-				       total_quantity, total_cost, amount, notes
-				FROM products 
-				ORDER BY date_mixed DESC
+	def _create_fts_index(self, conn, rebuild=False):
+		"""Create the ingredients_fts index and the triggers that keep it in sync.
+		Returns False if this SQLite build lacks FTS5, in which case name search uses LIKE."""
+		exists = conn.execute(
+			"SELECT 1 FROM sqlite_master WHERE type='table' AND name='ingredients_fts'"
+		).fetchone() is not None
+		
+		try:
+			conn.execute('''
+				CREATE VIRTUAL TABLE IF NOT EXISTS ingredients_fts
+				USING fts5(name, content='ingredients', content_rowid='id', tokenize='unicode61')
 			''')
-			return [dict(row) for row in cursor.fetchall()]
+		except sqlite3.OperationalError as e:
+			print(f"Full-text search unavailable, falling back to LIKE: {e}")
+			return False
+		
+		# Triggers belong to the ingredients table, so a table rebuild drops them
+		conn.execute('''
+			CREATE TRIGGER IF NOT EXISTS ingredients_fts_ai AFTER INSERT ON ingredients BEGIN
+				INSERT INTO ingredients_fts(rowid, name) VALUES (new.id, new.name);
+			END
+		''')
+		conn.execute('''
+			CREATE TRIGGER IF NOT EXISTS ingredients_fts_ad AFTER DELETE ON ingredients BEGIN
+				INSERT INTO ingredients_fts(ingredients_fts, rowid, name) VALUES ('delete', old.id, old.name);
+			END
+		''')
+		conn.execute('''
+			CREATE TRIGGER IF NOT EXISTS ingredients_fts_au AFTER UPDATE OF name ON ingredients BEGIN
+				INSERT INTO ingredients_fts(ingredients_fts, rowid, name) VALUES ('delete', old.id, old.name);
+				INSERT INTO ingredients_fts(rowid, name) VALUES (new.id, new.name);
+			END
+		''')
+		
+		if rebuild or not exists:
+			conn.execute("INSERT INTO ingredients_fts(ingredients_fts) VALUES ('rebuild')")
+		
+		return True
+	
+	def get_products_data(self, limit=None, offset=0, cursor=None):
+		"""Get products ordered by date_mixed (newest first), optionally one page at a time.
+		Pass cursor=[date_mixed, id] of the last row seen to page by keyset instead of offset"""
+		with self._get_db_connection() as conn:
+			if cursor is not None:
+				date_mixed, product_id = cursor
+				cursor = conn.execute(_SQL_GET_PRODUCTS_KEYSET_AFTER, (date_mixed, product_id, -1 if limit is None else limit))
+			elif limit is None:
+				cursor = conn.execute(_SQL_GET_PRODUCTS)
+			else:
+				cursor = conn.execute(_SQL_GET_PRODUCTS_PAGE, (limit, offset))
+			return cursor.fetchall()
+	
+	def get_products_page(self, cursor=None, limit=50):
+		"""Get one page of products (newest first) after the given cursor.
+		Returns {'rows': [...], 'next_cursor': [date_mixed, id] or None when there are no more pages}"""
+		with self._get_db_connection() as conn:
+			if cursor is None:
+				rows = conn.execute(_SQL_GET_PRODUCTS_KEYSET_FIRST, (limit,)).fetchall()
+			else:
+				date_mixed, product_id = cursor
+				rows = conn.execute(_SQL_GET_PRODUCTS_KEYSET_AFTER, (date_mixed, product_id, limit)).fetchall()
+		
+		next_cursor = [rows[-1]['date_mixed'], rows[-1]['id']] if len(rows) == limit else None
+		return {'rows': rows, 'next_cursor': next_cursor}
+	
+	def get_products_with_ingredients(self, limit=None):
+		"""Get products (newest first) each with an 'ingredients' list, in a single query"""
+		with self._get_db_connection() as conn:
+			rows = conn.execute(_SQL_GET_PRODUCTS_WITH_INGREDIENTS, (-1 if limit is None else limit,))
+			
+			products = []
+			for _, product_rows in itertools.groupby(rows, key=lambda row: row['id']):
+				product_rows = list(product_rows)
+				product = {key: value for key, value in product_rows[0].items() if not key.startswith('ing_')}
+				product['ingredients'] = [
+					{key[4:]: value for key, value in row.items() if key.startswith('ing_')}
+					for row in product_rows if row['ing_id'] is not None
+				]
+				product['has_flagged_ingredients'] = int(any(i['is_flagged'] for i in product['ingredients']))
+				products.append(product)
+			return products
+	
+	def get_products_with_ingredient_summary(self, limit=None):
+		"""Get products (newest first) with ingredient_names, ingredient_count and flagged_count, in a single query"""
+		with self._get_db_connection() as conn:
+			cursor = conn.execute(_SQL_GET_PRODUCTS_WITH_INGREDIENT_SUMMARY, (-1 if limit is None else limit,))
+			return cursor.fetchall()
+	
+	def get_products_iter(self, page_size=500):
+		"""Yield products one at a time (same order and fields as get_products_data) without building a list"""
+		# Read in keyset pages so the shared connection isn't held while the caller consumes rows
+		cursor = None
+		while True:
+			page = self.get_products_page(cursor, page_size)
+			yield from page['rows']
+			cursor = page['next_cursor']
+			if cursor is None:
+				return
 	
 	def get_product_ingredients(self, product_id):
 		"""Get all ingredients used in a specific product with their details"""
 		with self._get_db_connection() as conn:
-			cursor = conn.execute('''
-				SELECT 
-					i.id, i.barcode_id, i.name, i.purchase_date, i.expiration_date, i.supplier, i.is_flagged,
-					pi.quantity_used, pi.cost_per_unit,
-					(pi.quantity_used * pi.cost_per_unit) as total_ingredient_cost
-				FROM ingredients i
-				JOIN product_ingredients pi ON i.id = pi.ingredient_id
-				WHERE pi.product_id = ?
-				ORDER BY i.name
-			''', (product_id,))
-			return [dict(row) for row in cursor.fetchall()]
+			cursor = conn.execute(_SQL_GET_PRODUCT_INGREDIENTS, (product_id,))
+			return cursor.fetchall()
 	
-	def flag_ingredient(self, ingredient_id):
-		"""Flag an ingredient as problematic"""
+	def set_ingredient_flag(self, ingredient_id, is_flagged):
+		"""Flag or unflag an ingredient as problematic"""
 		try:
-			with self._get_db_connection() as conn:
-				conn.execute('''
-					UPDATE ingredients 
-					SET is_flagged = 1, last_updated = CURRENT_TIMESTAMP 
-					WHERE id = ?
-				''', (ingredient_id,))
-				conn.commit()
-				return self._success_response("Ingredient flagged successfully")
+			flag = int(bool(is_flagged))
+			with self._tx() as conn:
+				if conn.execute(_SQL_SET_INGREDIENT_FLAG, (flag, ingredient_id, flag)).rowcount == 0:
+					return self._success_response("No change")
+				self._invalidate_ingredient_caches()
+				return self._success_response(
+					"Ingredient flagged successfully" if is_flagged else "Ingredient unflagged successfully"
+				)
 		except Exception as e:
 			return self._error_response(e)
 	
-	def unflag_ingredient(self, ingredient_id):
-		"""Remove flag from an ingredient"""
+	def set_ingredient_flags(self, ingredient_ids, is_flagged):
+		"""Flag or unflag several ingredients with a single UPDATE"""
 		try:
-			with self._get_db_connection() as conn:
-				conn.execute('''
+			if not ingredient_ids:
+				return self._success_response("No ingredients to update", updated=0)
+			
+			flag = int(bool(is_flagged))
+			placeholders = ','.join('?' * len(ingredient_ids))
+			with self._tx() as conn:
+				# Only rows whose flag actually changes are written (and counted)
+				cursor = conn.execute(f'''
 					UPDATE ingredients 
-					SET is_flagged = 0, last_updated = CURRENT_TIMESTAMP 
-					WHERE id = ?
-				''', (ingredient_id,))
-				conn.commit()
-				return self._success_response("Ingredient unflagged successfully")
+					SET is_flagged = ?, last_updated = unixepoch() 
+					WHERE id IN ({placeholders}) AND is_flagged <> ?
+				''', [flag, *ingredient_ids, flag])
+				if cursor.rowcount:
+					self._invalidate_ingredient_caches()
+				return self._success_response(
+					f"{cursor.rowcount} ingredient(s) {'flagged' if is_flagged else 'unflagged'}",
+					updated=cursor.rowcount
+				)
 		except Exception as e:
 			return self._error_response(e)
+	
+	def flag_ingredient(self, ingredient_id):
+		"""Flag an ingredient as problematic"""
+		return self.set_ingredient_flag(ingredient_id, True)
+	
+	def unflag_ingredient(self, ingredient_id):
+		"""Remove flag from an ingredient"""
+		return self.set_ingredient_flag(ingredient_id, False)
 
 	def delete_ingredient(self, ingredient_id):
 		"""Delete an ingredient and its associated product relationships"""
 		try:
-			with self._get_db_connection() as conn:
-				# First check if ingredient exists
-				ingredient = conn.execute('SELECT name FROM ingredients WHERE id = ?', (ingredient_id,)).fetchone()
+			with self._tx() as conn:
+				# Delete the ingredient (product_ingredients rows cascade); no row back means it didn't exist
+				ingredient = conn.execute('DELETE FROM ingredients WHERE id = ? RETURNING barcode_id, name', (ingredient_id,)).fetchone()
 				if not ingredient:
 					return self._error_response("Ingredient not found")
 				
-				ingredient_name = ingredient['name']
-				
-				# Delete from product_ingredients table first (foreign key constraint)
-				conn.execute('DELETE FROM product_ingredients WHERE ingredient_id = ?', (ingredient_id,))
-				
-				# Delete the ingredient
-				conn.execute('DELETE FROM ingredients WHERE id = ?', (ingredient_id,))
-				conn.commit()
+				self._invalidate_ingredient_caches()
+				self._name_cache.pop(ingredient['barcode_id'], None)
 				
-				return self._success_response(f"Ingredient '{ingredient_name}' deleted successfully")
+				return self._success_response(f"Ingredient '{ingredient['name']}' deleted successfully")
 		except Exception as e:
 			return self._error_response(e)
 
 	def delete_product(self, product_id):
 		"""Delete a product and its associated ingredient relationships"""
 		try:
-			with self._get_db_connection() as conn:
-				# First check if product exists
-				product = conn.execute('SELECT product_name FROM products WHERE id = ?', (product_id,)).fetchone()
+			with self._tx() as conn:
+				# Delete the product (ingredient, group and parameter rows cascade); no row back means it didn't exist
+				product = conn.execute('DELETE FROM products WHERE id = ? RETURNING product_name', (product_id,)).fetchone()
 				if not product:
 					return self._error_response("Product not found")
 				
-				product_name = product['product_name']
-				
-				# Delete from product_ingredients table first (foreign key constraint)
-				conn.execute('DELETE FROM product_ingredients WHERE product_id = ?', (product_id,))
-				
-				# Delete the product
-				conn.execute('DELETE FROM products WHERE id = ?', (product_id,))
-				conn.commit()
-				
-				return self._success_response(f"Product '{product_name}' deleted successfully")
+				return self._success_response(f"Product '{product['product_name']}' deleted successfully")
 		except Exception as e:
 			return self._error_response(e)
 	
 	def get_flagged_ingredients(self):
 		"""Get all flagged ingredients"""
 		with self._get_db_connection() as conn:
-			cursor = conn.execute('SELECT id, name FROM ingredients WHERE is_flagged = 1')
-			return [dict(row) for row in cursor.fetchall()]
+			cursor = conn.execute(_SQL_GET_FLAGGED_INGREDIENTS)
+			return cursor.fetchall()
 	
 	def check_product_has_flagged_ingredients(self, product_id):
-		"""Check if a product contains any flagged ingredients"""
-		with sqlite3.connect(self.db_path) as conn:
-			cursor = conn.execute('''
-				SELECT COUNT(*) as flagged_count
-				FROM ingredients i
-				JOIN product_ingredients pi ON i.id = pi.ingredient_id
-				WHERE pi.product_id = ? AND i.is_flagged = 1
-			''', (product_id,))
-			result = cursor.fetchone()
-			return result[0] > 0
+		"""Check if a single product contains any flagged ingredients (listings get has_flagged_ingredients from get_products_data)"""
+		with self._get_db_connection() as conn:
+			cursor = conn.execute(_SQL_PRODUCT_HAS_FLAGGED_INGREDIENT, (product_id,))
+			return cursor.fetchone() is not None
 	
 	def search_products_by_ingredient_name(self, ingredient_name):
 		"""Search for products that contain ingredients matching the given name"""
-		with sqlite3.connect(self.db_path) as conn:
-			conn.row_factory = sqlite3.Row
+		# Quote each word so FTS5 operators in user input are taken literally; * makes it a prefix match
+		terms = ingredient_name.split()
+		if self.fts_enabled and terms:
+			match = ' '.join('"' + term.replace('"', '""') + '"*' for term in terms)
+			with self._get_db_connection() as conn:
+				cursor = conn.execute('''
+					SELECT p.id, p.barcode_id, p.product_name, p.batch_number, p.date_mixed, 
+					       p.total_quantity, p.total_cost, p.amount, p.notes
+					FROM products p
+					WHERE p.id IN (
+						SELECT pi.product_id
+						FROM product_ingredients pi
+						WHERE pi.ingredient_id IN (
+							SELECT rowid FROM ingredients_fts WHERE ingredients_fts MATCH ?
+						)
+					)
+					ORDER BY p.date_mixed DESC
+				''', (match,))
+				rows = cursor.fetchall()
+				return rows
+		
+		with self._get_db_connection() as conn:
 			cursor = conn.execute('''
 				SELECT DISTINCT p.id, p.barcode_id, p.product_name, p.batch_number, p.date_mixed, 
 				       p.total_quantity, p.total_cost, p.amount, p.notes
@@ -458,60 +934,47 @@ class DatabaseManager:
 				ORDER BY p.date_mixed DESC
 			''', (f'%{ingredient_name}%',))
 			rows = cursor.fetchall()
-			return [dict(row) for row in rows]
+			return rows
 	
 	def search_products_by_ingredient_barcode(self, barcode_id):
 		"""Search for products that contain ingredient with specific barcode ID (supports partial matching)"""
-		with sqlite3.connect(self.db_path) as conn:
-			conn.row_factory = sqlite3.Row
+		# Prefix match as a range so idx_ingredients_barcode is used (LIKE is case-insensitive and can't be);
+		# generated barcodes are digits/uppercase, so upper-casing keeps the old case-insensitive behaviour
+		prefix = barcode_id.upper()
+		upper_bound = prefix[:-1] + chr(ord(prefix[-1]) + 1) if prefix else '\U0010ffff'
+		with self._get_db_connection() as conn:
 			cursor = conn.execute('''
 				SELECT DISTINCT p.id, p.barcode_id, p.product_name, p.batch_number, p.date_mixed, 
 				       p.total_quantity, p.total_cost, p.amount, p.notes
 				FROM products p
 				JOIN product_ingredients pi ON p.id = pi.product_id
 				JOIN ingredients i ON pi.ingredient_id = i.id
-				WHERE i.barcode_id LIKE ?
+				WHERE i.barcode_id >= ? AND i.barcode_id < ?
 				ORDER BY p.date_mixed DESC
-			''', (f'{barcode_id}%',))
+			''', (prefix, upper_bound))
 			rows = cursor.fetchall()
-			return [dict(row) for row in rows]
+			return rows
 	
 	def search_ingredient_by_barcode(self, barcode_id):
 		"""Search for a specific ingredient by its barcode ID"""
-		with sqlite3.connect(self.db_path) as conn:
-			conn.row_factory = sqlite3.Row
-			cursor = conn.execute('''
-				SELECT id, barcode_id, name, unit_cost, 
-				       purchase_date, expiration_date, supplier, is_flagged
-				FROM ingredients 
-				WHERE barcode_id = ?
-			''', (barcode_id,))
+		with self._get_db_connection() as conn:
+			cursor = conn.execute(_SQL_SEARCH_INGREDIENT_BY_BARCODE, (barcode_id,))
 			row = cursor.fetchone()
-			return dict(row) if row else None
+			return row
 	
 	def get_product_by_id(self, product_id):
 		"""Get a specific product by its ID"""
 		with self._get_db_connection() as conn:
-			cursor = conn.execute('''
-				SELECT id, barcode_id, product_name, batch_number, date_mixed, 
-				       total_quantity, total_cost, amount, notes
-				FROM products 
-				WHERE id = ?
-			''', (product_id,))
+			cursor = conn.execute(_SQL_GET_PRODUCT_BY_ID, (product_id,))
 			row = cursor.fetchone()
-			return dict(row) if row else None
+			return row
 	
 	def get_ingredient_by_id(self, ingredient_id):
 		"""Get a specific ingredient by its ID"""
 		with self._get_db_connection() as conn:
-			cursor = conn.execute('''
-				SELECT id, barcode_id, name, unit_cost, supplier,
-				       purchase_date, expiration_date, is_flagged
-				FROM ingredients 
-				WHERE id = ?
-			''', (ingredient_id,))
+			cursor = conn.execute(_SQL_GET_INGREDIENT_BY_ID, (ingredient_id,))
 			row = cursor.fetchone()
-			return dict(row) if row else None
+			return row
 	
 	def update_product(self, product_data):
 		"""Update an existing product with new ingredient data"""
@@ -523,7 +986,7 @@ class DatabaseManager:
 					"message": "Please select at least one ingredient for the product"
 				}
 			
-			with self._get_db_connection() as conn:
+			with self._tx() as conn:
 				product_id = product_data['id']
 				mixed_date = self._parse_date(product_data['mixed_date'], datetime.now().date())
 				
@@ -536,7 +999,7 @@ class DatabaseManager:
 				amount = int(product_data.get('amount', 0))
 				conn.execute('''
 					UPDATE products 
-					SET product_name = ?, date_mixed = ?, amount = ?, notes = ?, last_updated = CURRENT_TIMESTAMP
+					SET product_name = ?, date_mixed = ?, amount = ?, notes = ?, last_updated = unixepoch()
 					WHERE id = ?
 				''', (product_data['product_name'], mixed_date, amount, "Updated via product edit modal", product_id))
 				
@@ -544,39 +1007,10 @@ class DatabaseManager:
 				conn.execute('DELETE FROM product_ingredients WHERE product_id = ?', (product_id,))
 				
 				# Add updated ingredients
-				total_cost = 0
-				total_quantity = 0
+				self._insert_product_ingredients(conn, product_id, product_data['ingredients'])
 				
-				for ingredient_data in product_data['ingredients']:
-					ingredient_id = ingredient_data['ingredient_id']
-					quantity = ingredient_data['quantity']
-					
-					# Get ingredient unit cost
-					ingredient_info = conn.execute(
-						"SELECT unit_cost FROM ingredients WHERE id = ?", 
-						(ingredient_id,)
-					).fetchone()
-					
-					if not ingredient_info:
-						raise Exception(f"Ingredient with ID {ingredient_id} not found")
-					
-					unit_cost = ingredient_info[0]
-					cost = quantity * unit_cost
-					total_cost += cost
-					total_quantity += quantity
-					
-					# Insert updated product-ingredient relationship
-					conn.execute('''
-						INSERT INTO product_ingredients (product_id, ingredient_id, quantity_used, cost_per_unit)
-						VALUES (?, ?, ?, ?)
-					''', (product_id, ingredient_id, quantity, unit_cost))
-				
-				# Update product totals
-				conn.execute('''
-					UPDATE products SET total_quantity = ?, total_cost = ? WHERE id = ?
-				''', (total_quantity, total_cost, product_id))
-				
-				conn.commit()
+				# Derive product totals from the new ingredient rows
+				self._recompute_product_totals(conn, product_id)
 				
 				return self._success_response("Product updated successfully", product_id=product_id)
 				
@@ -586,25 +1020,23 @@ class DatabaseManager:
 	def adjust_product_amount(self, product_id, delta):
 		"""Adjust product amount by the specified delta"""
 		try:
-			with self._get_db_connection() as conn:
+			with self._tx() as conn:
 				# Get current amount
 				current_product = conn.execute('SELECT amount FROM products WHERE id = ?', (product_id,)).fetchone()
 				if not current_product:
 					return self._error_response("Product not found")
 				
-				current_amount = current_product[0] or 0
+				current_amount = current_product['amount'] or 0
 				new_amount = max(0, current_amount + delta)  # Prevent negative amounts
 				
 				# Update the amount
 				conn.execute('''
 					UPDATE products 
-					SET amount = ?, last_updated = CURRENT_TIMESTAMP 
+					SET amount = ?, last_updated = unixepoch() 
 					WHERE id = ?
 				''', (new_amount, product_id))
 				self._log_inventory_event(conn, product_id, new_amount - current_amount, "Manual adjustment")
 				
-				conn.commit()
-				
 				return self._success_response(
 					"Product amount updated successfully",
 					new_amount=new_amount
@@ -616,7 +1048,7 @@ class DatabaseManager:
 	def update_product_amount(self, product_id, new_amount):
 		"""Update product amount to a specific value"""
 		try:
-			with self._get_db_connection() as conn:
+			with self._tx() as conn:
 				# Verify product exists
 				existing_product = conn.execute('SELECT id, amount FROM products WHERE id = ?', (product_id,)).fetchone()
 				if not existing_product:
@@ -624,18 +1056,16 @@ class DatabaseManager:
 				
 				# Ensure amount is non-negative
 				amount = max(0, int(new_amount))
-				current_amount = existing_product[1] or 0
+				current_amount = existing_product['amount'] or 0
 				
 				# Update the amount
 				conn.execute('''
 					UPDATE products 
-					SET amount = ?, last_updated = CURRENT_TIMESTAMP 
+					SET amount = ?, last_updated = unixepoch() 
 					WHERE id = ?
 				''', (amount, product_id))
 				self._log_inventory_event(conn, product_id, amount - current_amount, "Manual Inventory Adjustment")
 				
-				conn.commit()
-				
 				return self._success_response(
 					"Product amount updated successfully",
 					new_amount=amount
@@ -647,7 +1077,7 @@ class DatabaseManager:
 	def update_ingredient(self, ingredient_data):
 		"""Update an existing ingredient (barcode cannot be changed)"""
 		try:
-			with self._get_db_connection() as conn:
+			with self._tx() as conn:
 				ingredient_id = ingredient_data['id']
 				
 				# Verify ingredient exists
@@ -662,7 +1092,7 @@ class DatabaseManager:
 				conn.execute('''
 					UPDATE ingredients 
 					SET name = ?, supplier = ?, expiration_date = ?, unit_cost = ?, 
-					    purchase_date = ?, last_updated = CURRENT_TIMESTAMP
+					    purchase_date = ?, last_updated = unixepoch()
 					WHERE id = ?
 				''', (
 					ingredient_data['name'],
@@ -673,7 +1103,8 @@ class DatabaseManager:
 					ingredient_id
 				))
 				
-				conn.commit()
+				self._invalidate_ingredient_caches()
+				self._name_cache.pop(existing_ingredient['barcode_id'], None)
 				
 				# Get the updated ingredient data
 				updated_ingredient = conn.execute('''
@@ -682,7 +1113,7 @@ class DatabaseManager:
 					FROM ingredients WHERE id = ?
 				''', (ingredient_id,)).fetchone()
 				
-				ingredient_dict = dict(updated_ingredient) if updated_ingredient else {}
+				ingredient_dict = updated_ingredient or {}
 				
 				return self._success_response(
 					"Ingredient updated successfully",
@@ -693,15 +1124,20 @@ class DatabaseManager:
 			return self._error_response(e)
 	
 	def get_all_ingredients(self):
-		"""Get all available ingredients for product creation"""
+		"""Get all available ingredients for product creation (cached until an ingredient changes)"""
 		with self._get_db_connection() as conn:
-			cursor = conn.execute('''
-				SELECT id, barcode_id, name, unit_cost, supplier,
-				       purchase_date, expiration_date, is_flagged
-				FROM ingredients 
-				ORDER BY name
-			''')
-			return [dict(row) for row in cursor.fetchall()]
+			# Checked and filled under the lock writers bump the version under, so a stale read can't be cached
+			version, rows = self._ingredients_cache
+			if version != self._ingredients_version:
+				rows = tuple(conn.execute('''
+					SELECT id, barcode_id, name, unit_cost, supplier,
+					       purchase_date, expiration_date, is_flagged
+					FROM ingredients 
+					ORDER BY name
+				'''))
+				self._ingredients_cache = (self._ingredients_version, rows)
+		# Callers get their own row dicts, so changing one can't corrupt the cache
+		return [dict(row) for row in rows]
 	
 	def create_product(self, product_data):
 		"""Create a new product with ingredients"""
@@ -713,60 +1149,34 @@ class DatabaseManager:
 					"message": "Please select at least one ingredient for the product"
 				}
 			
-			with self._get_db_connection() as conn:
+			with self._tx() as conn:
 				mixed_date = self._parse_date(product_data['mixed_date'], datetime.now().date())
 				amount = int(product_data.get('amount', 0))
 				
-				# Insert product
+				# Insert product; the batch number is the next in sequence, taken under the write lock so it is unique
 				cursor = conn.execute('''
 					INSERT INTO products (barcode_id, product_name, batch_number, date_mixed, amount, notes)
-					VALUES (?, ?, ?, ?, ?, ?)
+					VALUES (?, ?, (
+						SELECT printf('BATCH%04d', COALESCE(MAX(CAST(SUBSTR(batch_number, 6) AS INTEGER)), 999) + 1)
+						FROM products
+					), ?, ?, ?)
 				''', (
 					self.generate_product_barcode(),
 					product_data['product_name'],
-					self.generate_batch_number(),
 					mixed_date,
 					amount,
 					"Created via product creation modal"
 				))
 				
 				product_id = cursor.lastrowid
-				total_cost = 0
-				total_quantity = 0
 				
-				# Add ingredients
-				for ingredient_data in product_data['ingredients']:
-					ingredient_id = ingredient_data['ingredient_id']
-					quantity = ingredient_data['quantity']
-					
-					# Get ingredient unit cost (unit is now always grams)
-					ingredient_info = conn.execute(
-						"SELECT unit_cost FROM ingredients WHERE id = ?", 
-						(ingredient_id,)
-					).fetchone()
-					
-					if not ingredient_info:
-						raise Exception(f"Ingredient with ID {ingredient_id} not found")
-					
-					unit_cost = ingredient_info[0]
-					cost = quantity * unit_cost
-					total_cost += cost
-					total_quantity += quantity
-					
-					# Insert product-ingredient relationship
-					conn.execute('''
-						INSERT INTO product_ingredients (product_id, ingredient_id, quantity_used, cost_per_unit)
-						VALUES (?, ?, ?, ?)
-					''', (product_id, ingredient_id, quantity, unit_cost))
+				# Insert all product-ingredient relationships
+				self._insert_product_ingredients(conn, product_id, product_data['ingredients'])
 				
-				# Update product totals
-				conn.execute('''
-					UPDATE products SET total_quantity = ?, total_cost = ? WHERE id = ?
-				''', (total_quantity, total_cost, product_id))
+				# Derive product totals from the rows just inserted
+				self._recompute_product_totals(conn, product_id)
 				self._log_inventory_event(conn, product_id, amount, "Product created", mixed_date)
 				
-				conn.commit()
-				
 				return {
 					"success": True,
 					"message": "Product created successfully",
@@ -779,6 +1189,49 @@ class DatabaseManager:
 				"message": str(e)
 			}
 
+	def _insert_product_ingredients(self, conn, product_id, ingredients):
+		"""Insert a product's ingredient rows, pricing them from one unit-cost lookup and one bulk insert"""
+		# Get all ingredient unit costs in one query (unit is now always grams)
+		ingredient_ids = [d['ingredient_id'] for d in ingredients]
+		placeholders = ','.join('?' * len(ingredient_ids))
+		cost_map = {
+			row['id']: row['unit_cost']
+			for row in conn.execute(
+				f"SELECT id, unit_cost FROM ingredients WHERE id IN ({placeholders})",
+				ingredient_ids
+			)
+		}
+		
+		rows = []
+		for ingredient_data in ingredients:
+			ingredient_id = ingredient_data['ingredient_id']
+			if ingredient_id not in cost_map:
+				raise Exception(f"Ingredient with ID {ingredient_id} not found")
+			rows.append((product_id, ingredient_id, ingredient_data['quantity'], cost_map[ingredient_id]))
+		
+		_multi_insert(
+			conn,
+			'INSERT INTO product_ingredients (product_id, ingredient_id, quantity_used, cost_per_unit) VALUES ',
+			'(?, ?, ?, ?)',
+			rows
+		)
+	
+	def _recompute_product_totals(self, conn, product_id=None):
+		"""Re-derive total_quantity/total_cost from product_ingredients for one product, or every product"""
+		if product_id is None:
+			conn.execute(_SQL_RECOMPUTE_PRODUCT_TOTALS)
+		else:
+			conn.execute(_SQL_RECOMPUTE_PRODUCT_TOTALS_ONE, (product_id,))
+	
+	def recompute_all_product_totals(self):
+		"""Recompute all product totals from their ingredient rows in a single statement"""
+		try:
+			with self._tx() as conn:
+				self._recompute_product_totals(conn)
+				return self._success_response("Product totals recomputed")
+		except Exception as e:
+			return self._error_response(e)
+
 	def get_inventory_events(self, limit=200):
 		"""Return inventory events ordered newest first."""
 		with self._get_db_connection() as conn:
@@ -793,12 +1246,12 @@ class DatabaseManager:
 				""",
 				(limit,)
 			)
-			return [dict(row) for row in cursor.fetchall()]
+			return cursor.fetchall()
 
 	def add_inventory_events(self, events, title=None, event_date=None):
 		"""Add one or more inventory events and update product amounts accordingly."""
 		try:
-			with self._get_db_connection() as conn:
+			with self._tx() as conn:
 				for entry in events:
 					product_id = entry.get('product_id')
 					delta = int(entry.get('delta', 0))
@@ -807,12 +1260,12 @@ class DatabaseManager:
 					current_row = conn.execute('SELECT amount FROM products WHERE id = ?', (product_id,)).fetchone()
 					if not current_row:
 						raise Exception(f"Product {product_id} not found")
-					current_amount = current_row[0] or 0
+					current_amount = current_row['amount'] or 0
 					if delta < 0 and current_amount + delta < 0:
 						raise Exception(f"Cannot remove more than in stock for product {product_id}")
 					new_amount = current_amount + delta
 					conn.execute(
-						"UPDATE products SET amount = ?, last_updated = CURRENT_TIMESTAMP WHERE id = ?",
+						"UPDATE products SET amount = ?, last_updated = unixepoch() WHERE id = ?",
 						(new_amount, product_id)
 					)
 					self._log_inventory_event(
@@ -822,7 +1275,6 @@ class DatabaseManager:
 						title or entry.get('event_title') or "Inventory event",
 						event_date or entry.get('event_date')
 					)
-				conn.commit()
 				return self._success_response("Events added")
 		except Exception as e:
 			return self._error_response(e)
@@ -830,7 +1282,7 @@ class DatabaseManager:
 	def create_ingredient(self, ingredient_data):
 		"""Create a new ingredient with barcode generation"""
 		try:
-			with self._get_db_connection() as conn:
+			with self._tx() as conn:
 				barcode_id = self.generate_ingredient_barcode()
 				expiry_date = self._parse_date(ingredient_data.get('expiry_date'))
 				
@@ -851,7 +1303,8 @@ class DatabaseManager:
 				))
 				
 				ingredient_id = cursor.lastrowid
-				conn.commit()
+				self._invalidate_ingredient_caches()
+				self._name_cache[barcode_id] = ingredient_data['name']
 				
 				# Get the created ingredient data
 				created_ingredient = conn.execute('''
@@ -860,7 +1313,7 @@ class DatabaseManager:
 					FROM ingredients WHERE id = ?
 				''', (ingredient_id,)).fetchone()
 				
-				ingredient_dict = dict(created_ingredient) if created_ingredient else {}
+				ingredient_dict = created_ingredient or {}
 				
 				return self._success_response(
 					"Ingredient created successfully",
@@ -878,30 +1331,27 @@ class DatabaseManager:
 	# Group Management Methods
 	
 	def get_all_groups(self):
-		"""Get all groups ordered by display_order"""
+		"""Get all groups ordered by display_order, with their product IDs"""
 		with self._get_db_connection() as conn:
+			# Aggregate product IDs server-side so all groups come back in one query
 			cursor = conn.execute('''
-				SELECT id, name, display_order, is_collapsed
-				FROM groups
-				ORDER BY display_order
+				SELECT g.id, g.name, g.display_order, g.is_collapsed,
+				       json_group_array(gp.product_id) FILTER (WHERE gp.product_id IS NOT NULL) AS product_ids
+				FROM groups g
+				LEFT JOIN group_products gp ON gp.group_id = g.id
+				GROUP BY g.id
+				ORDER BY g.display_order
 			''')
-			groups = [dict(row) for row in cursor.fetchall()]
-			
-			# For each group, get the product IDs
+			groups = cursor.fetchall()
 			for group in groups:
-				cursor = conn.execute('''
-					SELECT product_id
-					FROM group_products
-					WHERE group_id = ?
-				''', (group['id'],))
-				group['product_ids'] = [row[0] for row in cursor.fetchall()]
+				group['product_ids'] = json.loads(group['product_ids'])
 			
 			return groups
 	
 	def create_group(self, group_name):
 		"""Create a new group"""
 		try:
-			with self._get_db_connection() as conn:
+			with self._tx() as conn:
 				# Get the max display_order
 				cursor = conn.execute('SELECT MAX(display_order) as max_order FROM groups')
 				result = cursor.fetchone()
@@ -914,7 +1364,6 @@ class DatabaseManager:
 				''', (group_name, next_order))
 				
 				group_id = cursor.lastrowid
-				conn.commit()
 				
 				return self._success_response(
 					"Group created successfully",
@@ -927,35 +1376,25 @@ class DatabaseManager:
 	def delete_group(self, group_id):
 		"""Delete a group (products are not deleted, just removed from group)"""
 		try:
-			with self._get_db_connection() as conn:
-				# Verify group exists
-				group = conn.execute('SELECT name FROM groups WHERE id = ?', (group_id,)).fetchone()
+			with self._tx() as conn:
+				# Delete the group (group_products and group_parameters rows cascade); no row back means it didn't exist
+				group = conn.execute('DELETE FROM groups WHERE id = ? RETURNING name', (group_id,)).fetchone()
 				if not group:
 					return self._error_response("Group not found")
 				
-				group_name = group['name']
-				
-				# Delete group-product relationships (CASCADE will handle this, but explicit is clear)
-				conn.execute('DELETE FROM group_products WHERE group_id = ?', (group_id,))
-				
-				# Delete the group
-				conn.execute('DELETE FROM groups WHERE id = ?', (group_id,))
-				conn.commit()
-				
-				return self._success_response(f"Group '{group_name}' deleted successfully")
+				return self._success_response(f"Group '{group['name']}' deleted successfully")
 		except Exception as e:
 			return self._error_response(e)
 	
 	def update_group_order(self, group_id, new_order):
 		"""Update the display order of a group"""
 		try:
-			with self._get_db_connection() as conn:
+			with self._tx() as conn:
 				conn.execute('''
 					UPDATE groups 
-					SET display_order = ?, last_updated = CURRENT_TIMESTAMP 
+					SET display_order = ?, last_updated = unixepoch() 
 					WHERE id = ?
 				''', (new_order, group_id))
-				conn.commit()
 				
 				return self._success_response("Group order updated successfully")
 		except Exception as e:
@@ -964,13 +1403,12 @@ class DatabaseManager:
 	def update_group_collapsed_state(self, group_id, is_collapsed):
 		"""Update whether a group is collapsed"""
 		try:
-			with self._get_db_connection() as conn:
+			with self._tx() as conn:
 				conn.execute('''
 					UPDATE groups 
-					SET is_collapsed = ?, last_updated = CURRENT_TIMESTAMP 
+					SET is_collapsed = ?, last_updated = unixepoch() 
 					WHERE id = ?
 				''', (1 if is_collapsed else 0, group_id))
-				conn.commit()
 				
 				return self._success_response("Group collapsed state updated successfully")
 		except Exception as e:
@@ -979,17 +1417,16 @@ class DatabaseManager:
 	def update_group_name(self, group_id, new_name):
 		"""Rename a group"""
 		try:
-			with self._get_db_connection() as conn:
+			with self._tx() as conn:
 				# Verify group exists
 				existing = conn.execute('SELECT id FROM groups WHERE id = ?', (group_id,)).fetchone()
 				if not existing:
 					return self._error_response("Group not found")
 				conn.execute('''
 					UPDATE groups
-					SET name = ?, last_updated = CURRENT_TIMESTAMP
+					SET name = ?, last_updated = unixepoch()
 					WHERE id = ?
 				''', (new_name.strip(), group_id))
-				conn.commit()
 				return self._success_response("Group name updated")
 		except Exception as e:
 			return self._error_response(e)
@@ -997,7 +1434,7 @@ class DatabaseManager:
 	def update_group_parameter(self, parameter_id, new_name):
 		"""Rename a group parameter"""
 		try:
-			with self._get_db_connection() as conn:
+			with self._tx() as conn:
 				# Verify parameter exists
 				param = conn.execute('SELECT id, group_id FROM group_parameters WHERE id = ?', (parameter_id,)).fetchone()
 				if not param:
@@ -1008,7 +1445,6 @@ class DatabaseManager:
 					SET name = ?
 					WHERE id = ?
 				''', (new_name.strip(), parameter_id))
-				conn.commit()
 				return self._success_response("Group parameter updated")
 		except sqlite3.IntegrityError:
 			return self._error_response("A parameter with that name already exists in this group")
@@ -1018,20 +1454,17 @@ class DatabaseManager:
 	def add_product_to_group(self, group_id, product_id):
 		"""Add a product to a group"""
 		try:
-			with self._get_db_connection() as conn:
-				# Remove product from any existing group first (UNIQUE constraint on product_id)
-				# Also purge any existing custom parameter values tied to previous group's parameters
-				conn.execute('DELETE FROM group_products WHERE product_id = ?', (product_id,))
+			with self._tx() as conn:
+				# Purge any existing custom parameter values tied to previous group's parameters
 				conn.execute('DELETE FROM product_group_parameter_values WHERE product_id = ?', (product_id,))
 				
-				# Add to new group
+				# Add to new group, moving the existing membership row if there is one (UNIQUE on product_id)
 				conn.execute('''
 					INSERT INTO group_products (group_id, product_id)
 					VALUES (?, ?)
+					ON CONFLICT(product_id) DO UPDATE SET group_id = excluded.group_id
 				''', (group_id, product_id))
 				
-				conn.commit()
-				
 				return self._success_response("Product added to group successfully")
 		except Exception as e:
 			return self._error_response(e)
@@ -1039,12 +1472,11 @@ class DatabaseManager:
 	def remove_product_from_group(self, product_id):
 		"""Remove a product from its group"""
 		try:
-			with self._get_db_connection() as conn:
+			with self._tx() as conn:
 				# Remove relationship
 				conn.execute('DELETE FROM group_products WHERE product_id = ?', (product_id,))
 				# Purge any custom parameter values now that product is ungrouped
 				conn.execute('DELETE FROM product_group_parameter_values WHERE product_id = ?', (product_id,))
-				conn.commit()
 				
 				return self._success_response("Product removed from group successfully")
 		except Exception as e:
@@ -1060,7 +1492,7 @@ class DatabaseManager:
 				WHERE gp.product_id = ?
 			''', (product_id,))
 			row = cursor.fetchone()
-			return dict(row) if row else None
+			return row
 
 	# === Group Parameter Methods ===
 
@@ -1073,12 +1505,12 @@ class DatabaseManager:
 				WHERE group_id = ?
 				ORDER BY display_order, name
 			''', (group_id,))
-			return [dict(row) for row in cursor.fetchall()]
+			return cursor.fetchall()
 
 	def create_group_parameter(self, group_id, name):
 		"""Create a new parameter for a group"""
 		try:
-			with self._get_db_connection() as conn:
+			with self._tx() as conn:
 				# Determine next display_order
 				order_row = conn.execute('SELECT MAX(display_order) as max_order FROM group_parameters WHERE group_id = ?', (group_id,)).fetchone()
 				next_order = (order_row['max_order'] or -1) + 1
@@ -1087,7 +1519,6 @@ class DatabaseManager:
 					VALUES (?, ?, ?)
 				''', (group_id, name.strip(), next_order))
 				param_id = cursor.lastrowid
-				conn.commit()
 				return self._success_response("Group parameter created", parameter_id=param_id, display_order=next_order)
 		except Exception as e:
 			return self._error_response(e)
@@ -1095,10 +1526,9 @@ class DatabaseManager:
 	def delete_group_parameter(self, parameter_id):
 		"""Delete a group parameter and any product values referencing it"""
 		try:
-			with self._get_db_connection() as conn:
+			with self._tx() as conn:
 				conn.execute('DELETE FROM product_group_parameter_values WHERE group_parameter_id = ?', (parameter_id,))
 				conn.execute('DELETE FROM group_parameters WHERE id = ?', (parameter_id,))
-				conn.commit()
 				return self._success_response("Group parameter deleted")
 		except Exception as e:
 			return self._error_response(e)
@@ -1115,12 +1545,12 @@ class DatabaseManager:
 				JOIN group_parameters gp ON gp.id = pgpv.group_parameter_id
 				WHERE pgpv.product_id = ?
 			''', (product_id,))
-			return [dict(row) for row in cursor.fetchall()]
+			return cursor.fetchall()
 
 	def set_product_group_parameter_values(self, product_id, values_list):
 		"""Set (upsert) parameter values for a product. values_list: [{parameter_id, value}]"""
 		try:
-			with self._get_db_connection() as conn:
+			with self._tx() as conn:
 				for item in values_list or []:
 					param_id = item.get('parameter_id')
 					val = item.get('value', '')
@@ -1129,7 +1559,7 @@ class DatabaseManager:
 					# Try update first
 					updated = conn.execute('''
 						UPDATE product_group_parameter_values
-						SET value = ?, last_updated = CURRENT_TIMESTAMP
+						SET value = ?, last_updated = unixepoch()
 						WHERE product_id = ? AND group_parameter_id = ?
 					''', (val, product_id, param_id))
 					if updated.rowcount == 0:
@@ -1137,7 +1567,6 @@ class DatabaseManager:
 							INSERT INTO product_group_parameter_values (product_id, group_parameter_id, value)
 							VALUES (?, ?, ?)
 						''', (product_id, param_id, val))
-				conn.commit()
 				return self._success_response("Product parameter values saved")
 		except Exception as e:
 			return self._error_response(e)
\ No newline at end of file
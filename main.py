@@ -1,17 +1,41 @@
 import webview
 import os
 import sys
-import requests
 import json
-import tempfile
-import subprocess
-import shutil
+import re
+import functools
+import hashlib
 import time
+import multiprocessing
+import threading
+import uuid
+from urllib.parse import urljoin
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from packaging.version import Version, InvalidVersion
 from database import DatabaseManager, get_data_path
 
 # Application version
 APP_VERSION = "0.7.0"
 GITHUB_REPO = "nickrhenderson/Inventory-Management-System"
+# Newest release first (including pre-releases); one request whether or not a stable release exists
+GITHUB_RELEASES_URL = f"https://api.github.com/repos/{GITHUB_REPO}/releases?per_page=1"
+# Seconds fetched release information is reused before asking GitHub again
+UPDATE_CHECK_TTL = 15 * 60
+# Block size for reading and writing update downloads
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+# A SHA-256 hex digest in a release body, used when the asset has no digest of its own
+_SHA256_HEX_RE = re.compile(r'\b[0-9a-fA-F]{64}\b')
+# Bytes downloaded between progress updates pushed to the page
+DOWNLOAD_PROGRESS_INTERVAL = 4 * 1024 * 1024
+# Assets at least this large are fetched as parallel byte ranges when the server supports it
+PARALLEL_DOWNLOAD_MIN_SIZE = 8 * 1024 * 1024
+
+# Faster JSON parsing of GitHub responses when orjson is installed; both accept raw bytes
+try:
+	from orjson import loads as json_loads
+except ImportError:
+	from json import loads as json_loads
 
 # Windows-specific import for taskbar icon
 try:
@@ -22,10 +46,93 @@ except ImportError:
 	pass  # Not on Windows or ctypes not available
 
 
+@functools.lru_cache(maxsize=64)
+def _is_newer_version_cached(latest, current):
+	"""Compare version strings to determine if latest is newer than current (memoized; the inputs rarely change)"""
+	try:
+		# Plain x.y.z tags compare as zero-padded int tuples
+		latest_parts = tuple(map(int, latest.split('.')))
+		current_parts = tuple(map(int, current.split('.')))
+	except ValueError:
+		try:
+			# PEP 440 ordering for anything else, so pre-releases like 0.8.0rc1 sort before 0.8.0
+			return Version(latest) > Version(current)
+		except InvalidVersion:
+			# An unparseable tag isn't offered as an update
+			return False
+	
+	length = max(len(latest_parts), len(current_parts))
+	return latest_parts + (0,) * (length - len(latest_parts)) > current_parts + (0,) * (length - len(current_parts))
+
 
 class InventoryAPI:
+	# DatabaseManager methods the page calls unchanged; __getattr__ hands out the bound method directly
+	# instead of going through a one-line wrapper per method
+	_PASSTHROUGH = frozenset({
+		'get_products_data',
+		'get_products_with_ingredients',
+		'get_products_with_ingredient_summary',
+		'get_products_page',
+		'get_product_ingredients',
+		'flag_ingredient',
+		'unflag_ingredient',
+		'set_ingredient_flag',
+		'set_ingredient_flags',
+		'delete_ingredient',
+		'delete_product',
+		'get_flagged_ingredients',
+		'check_product_has_flagged_ingredients',
+		'search_products_by_ingredient_name',
+		'search_products_by_ingredient_barcode',
+		'search_ingredient_by_barcode',
+		'get_product_by_id',
+		'get_ingredient_by_id',
+		'update_product',
+		'adjust_product_amount',
+		'update_product_amount',
+		'update_ingredient',
+		'get_all_ingredients',
+		'create_product',
+		'create_ingredient',
+		'recompute_all_product_totals',
+		'get_all_groups',
+		'create_group',
+		'delete_group',
+		'update_group_order',
+		'update_group_collapsed_state',
+		'update_group_name',
+		'update_group_parameter',
+		'add_product_to_group',
+		'remove_product_from_group',
+		'get_product_group',
+		'get_group_parameters',
+		'create_group_parameter',
+		'delete_group_parameter',
+		'get_product_group_parameter_values',
+		'set_product_group_parameter_values',
+		'get_inventory_events',
+		'add_inventory_events',
+		'generate_barcode_pdf'
+	})
+	
 	def __init__(self):
 		self.db_manager = DatabaseManager(APP_VERSION)
+		self._data_dir = get_data_path()
+		# Last release fetched and its ETag (see _fetch_latest_release), persisted across restarts
+		self._update_cache_path = os.path.join(self._data_dir, 'update_cache.json')
+		self._update_cache = None
+		# HTTP clients for the update check and download, built on first use (see _get_http) so
+		# requests/urllib3 aren't imported while the window is starting up
+		self._http = None
+		self._download_pool = None
+		self._http_lock = threading.Lock()
+		# Update downloads run here so the js_api call returns at once; futures kept by token
+		self._update_executor = ThreadPoolExecutor(max_workers=2)
+		self._downloads = {}
+		# Latest (downloaded, total) byte counts per token, for get_task_status
+		self._download_progress = {}
+		# Set by main() once the window exists, for pushing progress to the page
+		self._window = None
 	
 	def _success_response(self, message, **kwargs):
 		"""Create a standardized success response"""
@@ -36,196 +143,64 @@ class InventoryAPI:
 	def _error_response(self, error):
 		"""Create a standardized error response"""
 		return {"success": False, "message": str(error)}
-
-
-
-	def get_products_data(self):
-		"""Get all products ordered by date_mixed (newest first)"""
-		return self.db_manager.get_products_data()
-	
-	def get_product_ingredients(self, product_id):
-		"""Get all ingredients used in a specific product with their details"""
-		return self.db_manager.get_product_ingredients(product_id)
 	
-	def flag_ingredient(self, ingredient_id):
-		"""Flag an ingredient as problematic"""
-		return self.db_manager.flag_ingredient(ingredient_id)
-	
-	def unflag_ingredient(self, ingredient_id):
-		"""Remove flag from an ingredient"""
-		return self.db_manager.unflag_ingredient(ingredient_id)
-
-	def delete_ingredient(self, ingredient_id):
-		"""Delete an ingredient and its associated product relationships"""
-		return self.db_manager.delete_ingredient(ingredient_id)
-
-	def delete_product(self, product_id):
-		"""Delete a product and its associated ingredient relationships"""
-		return self.db_manager.delete_product(product_id)
+	def __getattr__(self, name):
+		"""Expose the DatabaseManager methods in _PASSTHROUGH as if they were defined here"""
+		if name in InventoryAPI._PASSTHROUGH:
+			method = getattr(self.db_manager, name)
+			# Cache the bound method so later lookups don't come back through here
+			self.__dict__[name] = method
+			return method
+		raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
 	
-	def get_flagged_ingredients(self):
-		"""Get all flagged ingredients"""
-		return self.db_manager.get_flagged_ingredients()
-	
-	def check_product_has_flagged_ingredients(self, product_id):
-		"""Check if a product contains any flagged ingredients"""
-		return self.db_manager.check_product_has_flagged_ingredients(product_id)
-	
-	def search_products_by_ingredient_name(self, ingredient_name):
-		"""Search for products that contain ingredients matching the given name"""
-		return self.db_manager.search_products_by_ingredient_name(ingredient_name)
-	
-	def search_products_by_ingredient_barcode(self, barcode_id):
-		"""Search for products that contain ingredient with specific barcode ID (supports partial matching)"""
-		return self.db_manager.search_products_by_ingredient_barcode(barcode_id)
-	
-	def search_ingredient_by_barcode(self, barcode_id):
-		"""Search for a specific ingredient by its barcode ID"""
-		return self.db_manager.search_ingredient_by_barcode(barcode_id)
-	
-	def get_product_by_id(self, product_id):
-		"""Get a specific product by its ID"""
-		return self.db_manager.get_product_by_id(product_id)
-	
-	def get_ingredient_by_id(self, ingredient_id):
-		"""Get a specific ingredient by its ID"""
-		return self.db_manager.get_ingredient_by_id(ingredient_id)
-	
-	def update_product(self, product_data):
-		"""Update an existing product with new ingredient data"""
-		return self.db_manager.update_product(product_data)
-	
-	def adjust_product_amount(self, product_id, delta):
-		"""Adjust product amount by the specified delta"""
-		return self.db_manager.adjust_product_amount(product_id, delta)
-
-	def update_product_amount(self, product_id, new_amount):
-		"""Update product amount to a specific value"""
-		return self.db_manager.update_product_amount(product_id, new_amount)
-
-	def update_ingredient(self, ingredient_data):
-		"""Update an existing ingredient (barcode cannot be changed)"""
-		return self.db_manager.update_ingredient(ingredient_data)
-	
-	def get_all_ingredients(self):
-		"""Get all available ingredients for product creation"""
-		return self.db_manager.get_all_ingredients()
-	
-	def create_product(self, product_data):
-		"""Create a new product with ingredients"""
-		return self.db_manager.create_product(product_data)
-	
-	def create_ingredient(self, ingredient_data):
-		"""Create a new ingredient with barcode generation"""
-		return self.db_manager.create_ingredient(ingredient_data)
+	def __dir__(self):
+		"""Include the pass-through methods so pywebview's js_api introspection exposes them"""
+		return sorted(set(super().__dir__()) | InventoryAPI._PASSTHROUGH)
 	
 	def get_inventory_data(self):
 		"""Legacy method - now returns products data for compatibility"""
 		return self.db_manager.get_products_data()
 	
-	# Group management methods
-	
-	def get_all_groups(self):
-		"""Get all groups with their product IDs"""
-		return self.db_manager.get_all_groups()
-	
-	def create_group(self, group_name):
-		"""Create a new group"""
-		return self.db_manager.create_group(group_name)
-	
-	def delete_group(self, group_id):
-		"""Delete a group (products remain, just removed from group)"""
-		return self.db_manager.delete_group(group_id)
-	
-	def update_group_order(self, group_id, new_order):
-		"""Update the display order of a group"""
-		return self.db_manager.update_group_order(group_id, new_order)
-	
-	def update_group_collapsed_state(self, group_id, is_collapsed):
-		"""Update whether a group is collapsed or expanded"""
-		return self.db_manager.update_group_collapsed_state(group_id, is_collapsed)
-
-	def update_group_name(self, group_id, new_name):
-		"""Rename a group"""
-		return self.db_manager.update_group_name(group_id, new_name)
-
-	def update_group_parameter(self, parameter_id, new_name):
-		"""Rename a group parameter"""
-		return self.db_manager.update_group_parameter(parameter_id, new_name)
-	
-	def add_product_to_group(self, group_id, product_id):
-		"""Add a product to a group"""
-		return self.db_manager.add_product_to_group(group_id, product_id)
-	
-	def remove_product_from_group(self, product_id):
-		"""Remove a product from its group"""
-		return self.db_manager.remove_product_from_group(product_id)
-	
-	def get_product_group(self, product_id):
-		"""Get the group that a product belongs to (if any)"""
-		return self.db_manager.get_product_group(product_id)
-
-	# Group parameter API wrappers
-
-	def get_group_parameters(self, group_id):
-		"""Get parameters defined for a group"""
-		return self.db_manager.get_group_parameters(group_id)
-
-	def create_group_parameter(self, group_id, name):
-		"""Create a new parameter for a group"""
-		return self.db_manager.create_group_parameter(group_id, name)
-
-	def delete_group_parameter(self, parameter_id):
-		"""Delete a group parameter"""
-		return self.db_manager.delete_group_parameter(parameter_id)
-
-	def get_product_group_parameter_values(self, product_id):
-		"""Get custom parameter values for a product"""
-		return self.db_manager.get_product_group_parameter_values(product_id)
-
-	def set_product_group_parameter_values(self, product_id, values_list):
-		"""Set (upsert) custom parameter values for a product"""
-		return self.db_manager.set_product_group_parameter_values(product_id, values_list)
-
-	def get_inventory_events(self, limit=200):
-		"""Return inventory events newest-first."""
-		return self.db_manager.get_inventory_events(limit)
-
-	def add_inventory_events(self, events, title=None, event_date=None):
-		"""Add inventory events with validation (no over-removal)."""
-		return self.db_manager.add_inventory_events(events, title, event_date)
-	
-	def generate_barcode_pdf(self, barcode_id):
-		"""Generate a PDF file with a printable barcode optimized for 1.5" x 1" labels (PLS198)"""
-		return self.db_manager.generate_barcode_pdf(barcode_id)
-	
 	def get_app_version(self):
 		"""Get the current application version"""
 		return self._success_response("Version retrieved", version=APP_VERSION)
 	
-	def check_for_updates(self):
-		"""Check for updates on GitHub releases"""
-		try:
-			# GitHub API endpoint for latest release (this excludes pre-releases)
-			url = f"https://api.github.com/repos/{GITHUB_REPO}/releases/latest"
-			
-			response = requests.get(url, timeout=10)
-			
-			# If no latest release found (404), try to get all releases and find the latest
-			if response.status_code == 404:
-				url = f"https://api.github.com/repos/{GITHUB_REPO}/releases"
-				response = requests.get(url, timeout=10)
-				response.raise_for_status()
+	def _get_http(self):
+		"""Get the (requests session, urllib3 pool) pair used for updates, creating them on first call"""
+		with self._http_lock:
+			if self._http is None:
+				import requests
+				import urllib3
+				from requests.adapters import HTTPAdapter
 				
-				releases = response.json()
-				if not releases:
-					return self._error_response("No releases found in repository")
-				
-				# Get the most recent release (including pre-releases)
-				release_data = releases[0]
-			else:
-				response.raise_for_status()
-				release_data = response.json()
+				# One pooled HTTP session so GitHub API calls reuse connections, retrying transient gateway errors
+				http = requests.Session()
+				http.headers.update({
+					'Accept': 'application/vnd.github+json',
+					'User-Agent': f'InventorySystem/{APP_VERSION}'
+				})
+				http.mount('https://', HTTPAdapter(
+					pool_connections=4,
+					pool_maxsize=4,
+					max_retries=urllib3.Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504])
+				))
+				# Asset downloads go straight through urllib3: they only need raw bytes, not the requests layer
+				self._download_pool = urllib3.PoolManager(
+					maxsize=8,
+					retries=urllib3.Retry(total=3, backoff_factor=0.5),
+					headers={'User-Agent': f'InventorySystem/{APP_VERSION}'}
+				)
+				self._http = http
+			return self._http, self._download_pool
+	
+	def check_for_updates(self, force=False):
+		"""Check for updates on GitHub releases (force=True skips the cached release)"""
+		import requests
+		
+		try:
+			release_data = self._fetch_latest_release(force)
+			if release_data is None:
+				return self._error_response("No releases found in repository")
 			
 			latest_version = release_data.get('tag_name', '').lstrip('v')
 			
@@ -246,48 +221,310 @@ class InventoryAPI:
 		except Exception as e:
 			return self._error_response(f"Failed to check for updates: {str(e)}")
 	
+	def _fetch_latest_release(self, force=False):
+		"""Get the newest release's JSON (None if there are no releases), shared by the update check and install.
+		Reused for UPDATE_CHECK_TTL, then revalidated with its ETag; force=True skips the TTL"""
+		update_cache = self._load_update_cache()
+		has_release = 'release' in update_cache
+		if not force and has_release and time.time() - update_cache.get('fetched_at', 0) < UPDATE_CHECK_TTL:
+			return update_cache['release']
+		
+		# A matching ETag gets a bodiless 304 back (which GitHub doesn't count against the rate limit)
+		headers = {}
+		if has_release and update_cache.get('etag'):
+			headers['If-None-Match'] = update_cache['etag']
+		http, _ = self._get_http()
+		response = http.get(GITHUB_RELEASES_URL, headers=headers, timeout=10)
+		
+		if response.status_code == 304:
+			release_data = update_cache['release']
+		else:
+			response.raise_for_status()
+			releases = json_loads(response.content)
+			release_data = releases[0] if releases else None
+		
+		self._save_update_cache(response.headers.get('ETag') or update_cache.get('etag'), release_data)
+		return release_data
+	
+	def _load_update_cache(self):
+		"""Get the saved {'etag', 'release', 'fetched_at'} from the last release fetch ({} if there isn't one)"""
+		if self._update_cache is None:
+			try:
+				with open(self._update_cache_path, 'r', encoding='utf-8') as f:
+					self._update_cache = json.load(f)
+			except (OSError, ValueError):
+				self._update_cache = {}
+		return self._update_cache
+	
+	def _save_update_cache(self, etag, release_data):
+		"""Remember the release and its ETag, in memory and on disk so a restart can still get a 304"""
+		self._update_cache = {'etag': etag, 'release': release_data, 'fetched_at': time.time()}
+		try:
+			with open(self._update_cache_path, 'w', encoding='utf-8') as f:
+				json.dump(self._update_cache, f)
+		except OSError:
+			pass  # Only costs a full fetch next time
+	
 	def _is_newer_version(self, latest, current):
 		"""Compare version strings to determine if latest is newer than current"""
+		return _is_newer_version_cached(latest, current)
+	
+	def _notify_js(self, function_name, *args):
+		"""Call window.<function_name>(*args) in the page, if the page defines it"""
+		if self._window is not None:
+			self._window.evaluate_js(f"window.{function_name} && window.{function_name}(...{json.dumps(list(args))})")
+	
+	def _progress_reporter(self, token, total):
+		"""Return a thread-safe callback that counts downloaded bytes and pushes
+		window.onDownloadProgress(token, downloaded, total) every DOWNLOAD_PROGRESS_INTERVAL"""
+		lock = threading.Lock()
+		state = {'downloaded': 0, 'reported': 0}
+		
+		def on_progress(byte_count):
+			with lock:
+				state['downloaded'] += byte_count
+				downloaded = state['downloaded']
+				self._download_progress[token] = (downloaded, total)
+				if downloaded - state['reported'] < DOWNLOAD_PROGRESS_INTERVAL and downloaded != total:
+					return
+				state['reported'] = downloaded
+			self._notify_js('onDownloadProgress', token, downloaded, total)
+		
+		return on_progress
+	
+	def _copy_stream(self, source, target, on_progress, hasher=None, stop=None):
+		"""Copy source to target in DOWNLOAD_CHUNK_SIZE blocks, reporting each block to on_progress
+		(and feeding it to hasher, if given); returns early once the stop event, if given, is set"""
+		while stop is None or not stop.is_set():
+			block = source.read(DOWNLOAD_CHUNK_SIZE)
+			if not block:
+				return
+			target.write(block)
+			if hasher is not None:
+				hasher.update(block)
+			on_progress(len(block))
+	
+	@contextmanager
+	def _open_download(self, url, headers=None):
+		"""Start a streamed GET on the download pool and yield (response, final URL after redirects),
+		raising on HTTP errors and freeing the connection after"""
+		import urllib3
+		
+		_, download_pool = self._get_http()
+		if headers:
+			# Per-request headers replace the pool's defaults, so merge them in to keep the User-Agent
+			headers = {**download_pool.headers, **headers}
+		# Follow redirects here so the final (CDN) URL is known; urllib3 only reports its path
+		for _ in range(5):
+			r = download_pool.request('GET', url, headers=headers, preload_content=False, redirect=False, timeout=30)
+			location = r.get_redirect_location()
+			if not location:
+				break
+			r.drain_conn()
+			r.release_conn()
+			url = urljoin(url, location)
+		else:
+			# Every response so far was a redirect, and each one's connection is already released
+			raise urllib3.exceptions.HTTPError(f"Too many redirects downloading {url}")
+		
 		try:
-			# Simple version comparison - assumes semantic versioning (x.y.z)
-			latest_parts = [int(x) for x in latest.split('.')]
-			current_parts = [int(x) for x in current.split('.')]
-			
-			# Pad shorter version with zeros
-			max_len = max(len(latest_parts), len(current_parts))
-			latest_parts.extend([0] * (max_len - len(latest_parts)))
-			current_parts.extend([0] * (max_len - len(current_parts)))
+			if r.status >= 400:
+				raise urllib3.exceptions.HTTPError(f"HTTP {r.status} downloading {url}")
+			yield r, url
+		finally:
+			# A partly read body can't go back to the pool, so drop that connection instead
+			if not r.isclosed():
+				r.close()
+			r.release_conn()
+	
+	def _download_ranges(self, url, file_path, total, on_progress, workers=4):
+		"""Download url into file_path as `workers` parallel byte ranges.
+		Returns False (leaving the caller to stream it) if the server answers a range with anything but 206;
+		the other workers are stopped and joined first, so none of them is still writing or reporting progress"""
+		# Size the file once so every worker can write its range in place
+		with open(file_path, 'wb') as f:
+			f.truncate(total)
+		
+		part_size = -(-total // workers)
+		ranges = [(start, min(start + part_size, total) - 1) for start in range(0, total, part_size)]
+		
+		# Set when any range fails, so the rest stop instead of finishing a download that will be redone
+		stop = threading.Event()
+		
+		def fetch(byte_range):
+			start, end = byte_range
+			try:
+				with self._open_download(url, {'Range': f'bytes={start}-{end}'}) as (r, _):
+					if r.status != 206:
+						stop.set()
+						return False
+					with open(file_path, 'r+b', buffering=DOWNLOAD_CHUNK_SIZE) as f:
+						f.seek(start)
+						self._copy_stream(r, f, on_progress, stop=stop)
+						if stop.is_set():
+							return False
+						if f.tell() != end + 1:
+							raise IOError(f"Incomplete download of bytes {start}-{end}")
+				return True
+			except BaseException:
+				stop.set()
+				raise
+		
+		# Leaving the with block joins every worker before the result is used
+		with ThreadPoolExecutor(max_workers=len(ranges)) as executor:
+			results = list(executor.map(fetch, ranges))
+		return all(results)
+	
+	def _swap_exe(self, new_exe, current_exe):
+		"""Move the running exe aside to <exe>.old and the new one into its place.
+		Windows lets a running exe be renamed (not overwritten), and a same-volume rename is metadata-only.
+		Returns False, with nothing changed, if either rename fails (e.g. the download is on another volume).
+		Raises RuntimeError if the running exe was moved aside and could not be moved back"""
+		old_exe = current_exe + '.old'
+		try:
+			os.replace(current_exe, old_exe)
+		except OSError:
+			return False
+		try:
+			os.replace(new_exe, current_exe)
+		except OSError:
+			try:
+				os.replace(old_exe, current_exe)
+			except OSError as e:
+				raise RuntimeError(
+					f"the app was moved to {old_exe} and could not be moved back ({e}); "
+					f"rename it to {os.path.basename(current_exe)} before restarting"
+				) from e
+			return False
+		return True
+	
+	def download_and_install_update(self):
+		"""Start downloading and installing the latest release in the background and return its token.
+		Progress is pushed to window.onDownloadProgress(token, downloaded, total) and a failure to
+		window.onUpdateError(token, message); on success the app exits and the updater relaunches it."""
+		token = uuid.uuid4().hex
+		self._downloads[token] = self._update_executor.submit(self._run_update, token)
+		return self._success_response("Downloading update...", token=token)
+	
+	def get_task_status(self, token):
+		"""Poll a background update started by download_and_install_update, for when a pushed
+		progress/error callback was missed (e.g. the page reloaded mid-download)"""
+		future = self._downloads.get(token)
+		if future is None:
+			return self._error_response("Unknown update task")
+		
+		downloaded, total = self._download_progress.get(token, (0, None))
+		message, state, result = "Update status retrieved", 'running', None
+		if future.done():
+			# An exception that escaped the worker is reported, not re-raised into the JS bridge
+			exc = future.exception()
+			if exc is not None:
+				message, state = str(exc), 'error'
+			else:
+				state, result = 'done', future.result()
+		
+		return self._success_response(
+			message,
+			state=state,
+			done=state != 'running',
+			downloaded=downloaded,
+			total=total,
+			result=result
+		)
+	
+	def _run_update(self, token):
+		"""Worker for download_and_install_update; only returns (and reports) on failure"""
+		try:
+			result = self._install_update(token)
+		except Exception as e:
+			result = self._error_response(f"Failed to install update: {str(e)}")
+		self._notify_js('onUpdateError', token, result['message'])
+		return result
+	
+	def _download_exe(self, token, url, file_path):
+		"""Download url to file_path (in parallel ranges when the server allows it), reporting progress under token.
+		Returns the SHA-256 hex digest when it could be computed while streaming, else None"""
+		with self._open_download(url) as (r, asset_url):
+			total_size = int(r.headers.get('content-length', 0))
+			on_progress = self._progress_reporter(token, total_size)
 			
-			for latest_part, current_part in zip(latest_parts, current_parts):
-				if latest_part > current_part:
-					return True
-				elif latest_part < current_part:
-					return False
+			# Large, unencoded assets from a server that accepts Range download in parallel pieces
+			# (asset_url is the final CDN URL after GitHub's redirect)
+			downloaded = (
+				total_size >= PARALLEL_DOWNLOAD_MIN_SIZE
+				and r.headers.get('Accept-Ranges') == 'bytes'
+				and 'Content-Encoding' not in r.headers
+				and self._download_ranges(asset_url, file_path, total_size, on_progress)
+			)
 			
-			return False  # Versions are equal
+			if downloaded:
+				# Ranges arrive out of order, so the caller has to hash the finished file
+				return None
 			
-		except (ValueError, AttributeError):
-			# If version parsing fails, assume update is available to be safe
-			return True
+			# Start the count over; bytes from abandoned range requests would otherwise be counted twice
+			on_progress = self._progress_reporter(token, total_size)
+			# Stream straight to disk in 1 MiB blocks, hashing as we go so the file isn't read back
+			hasher = hashlib.sha256()
+			# Buffer as large as a block so each copy turns into one write syscall
+			with open(file_path, 'wb', buffering=DOWNLOAD_CHUNK_SIZE) as f:
+				# Reserve the space up front (one extent instead of growing per write) and hint sequential access
+				if total_size:
+					try:
+						os.posix_fallocate(f.fileno(), 0, total_size)
+					except (AttributeError, OSError):
+						# Windows: setting the length once still avoids repeated NTFS extensions
+						f.truncate(total_size)
+				if hasattr(os, 'posix_fadvise'):
+					os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+				self._copy_stream(r, f, on_progress, hasher)
+				# The file was sized up front, so a dropped connection would otherwise leave zero padding
+				if total_size and f.tell() != total_size:
+					raise IOError("Download incomplete - connection closed early")
+			return hasher.hexdigest()
+	
+	def _expected_sha256(self, release_data, exe_asset):
+		"""Get the published SHA-256 of the exe asset (lowercase hex), or None if the release has none.
+		Raises ValueError if the release notes list hashes but not exactly one for this asset"""
+		# Newer GitHub releases publish each asset's hash as digest="sha256:<hex>"
+		digest = exe_asset.get('digest') or ''
+		if digest.startswith('sha256:'):
+			return digest[len('sha256:'):].lower()
+		
+		# Otherwise use the hash on the release-notes line that names the asset
+		# (e.g. "InventorySystem.exe SHA256: <hex>" or sha256sum's "<hex>  InventorySystem.exe")
+		body = release_data.get('body') or ''
+		if not _SHA256_HEX_RE.search(body):
+			return None
+		asset_name = exe_asset['name'].lower()
+		hashes = {
+			match.lower()
+			for line in body.splitlines() if asset_name in line.lower()
+			for match in _SHA256_HEX_RE.findall(line)
+		}
+		if not hashes:
+			raise ValueError(f"the release notes list SHA-256 hashes, but none for {exe_asset['name']}")
+		if len(hashes) > 1:
+			raise ValueError(f"the release notes list more than one SHA-256 hash for {exe_asset['name']}")
+		return hashes.pop()
+	
+	def _remove_quietly(self, path):
+		"""Delete path if it exists, ignoring errors"""
+		try:
+			os.remove(path)
+		except OSError:
+			pass
 	
-	def download_and_install_update(self):
+	def _install_update(self, token):
 		"""Download latest EXE, spawn a copied updater, then exit to allow replacement."""
+		import requests
+		import urllib3
+		import subprocess
+		
 		try:
-			# Get latest release information
-			url = f"https://api.github.com/repos/{GITHUB_REPO}/releases/latest"
-			response = requests.get(url, timeout=10)
-			
-			if response.status_code == 404:
-				url = f"https://api.github.com/repos/{GITHUB_REPO}/releases"
-				response = requests.get(url, timeout=10)
-				response.raise_for_status()
-				releases = response.json()
-				if not releases:
-					return self._error_response("No releases found in repository")
-				release_data = releases[0]
-			else:
-				response.raise_for_status()
-				release_data = response.json()
+			# Get latest release information (normally still cached from the update check)
+			release_data = self._fetch_latest_release()
+			if release_data is None:
+				return self._error_response("No releases found in repository")
 			
 			# Find the exe asset
 			assets = release_data.get('assets', [])
@@ -300,79 +537,152 @@ class InventoryAPI:
 			if not exe_asset:
 				return self._error_response("No executable file found in the latest release")
 			
+			# Known before downloading, so a release that can't be verified doesn't cost a download
+			try:
+				expected_sha256 = self._expected_sha256(release_data, exe_asset)
+			except ValueError as e:
+				return self._error_response(f"Cannot verify the update: {str(e)}")
+			
 			# Get current executable path
 			current_exe = sys.executable if getattr(sys, 'frozen', False) else os.path.abspath(sys.argv[0])
 			current_dir = os.path.dirname(current_exe)
 			current_filename = os.path.basename(current_exe)
 			
-			# Download the new exe to a temporary location
-			download_url = exe_asset['browser_download_url']
-			temp_dir = tempfile.mkdtemp()
-			temp_exe_path = os.path.join(temp_dir, f"new_{current_filename}")
+			# Download to a .part file in the data dir, renamed once it's complete and verified
+			# (no temp dir to create or rmtree, and the rename never crosses volumes)
+			temp_exe_path = os.path.join(self._data_dir, f"new_{current_filename}")
+			part_path = temp_exe_path + '.part'
 			
-			# Download with progress indication
-			with requests.get(download_url, stream=True, timeout=30) as r:
-				r.raise_for_status()
-				total_size = int(r.headers.get('content-length', 0))
-				
-				with open(temp_exe_path, 'wb') as f:
-					downloaded = 0
-					for chunk in r.iter_content(chunk_size=8192):
-						if chunk:
-							f.write(chunk)
-							downloaded += len(chunk)
+			try:
+				actual_sha256 = self._download_exe(token, exe_asset['browser_download_url'], part_path)
+			except Exception:
+				self._remove_quietly(part_path)
+				raise
 			
 			# Verify the download
-			if not os.path.exists(temp_exe_path) or os.path.getsize(temp_exe_path) == 0:
-				os.remove(temp_exe_path)
-				shutil.rmtree(temp_dir)
+			if not os.path.exists(part_path) or os.path.getsize(part_path) == 0:
+				self._remove_quietly(part_path)
 				return self._error_response("Download failed - file is empty or corrupted")
 			
+			if expected_sha256:
+				if actual_sha256 is None:
+					with open(part_path, 'rb') as f:
+						actual_sha256 = hashlib.file_digest(f, 'sha256').hexdigest()
+				if actual_sha256 != expected_sha256:
+					self._remove_quietly(part_path)
+					return self._error_response("Download failed - checksum mismatch")
+			
+			os.replace(part_path, temp_exe_path)
+			
+			# Same-volume installs swap the files right away and skip the updater round trip
+			if getattr(sys, 'frozen', False):
+				try:
+					swapped = self._swap_exe(temp_exe_path, current_exe)
+				except RuntimeError as e:
+					return self._error_response(f"Update failed and the app could not be restored: {str(e)}")
+				if swapped:
+					subprocess.Popen([current_exe], shell=False, creationflags=subprocess.DETACHED_PROCESS)
+					os._exit(0)
+			
 			# Create updater.exe by copying current exe to a writable data directory
-			data_dir = get_data_path()
-			updater_path = os.path.join(data_dir, 'Updater.exe')
+			updater_path = os.path.join(self._data_dir, 'Updater.exe')
 			try:
-				shutil.copy2(current_exe, updater_path)
+				_fast_copy(current_exe, updater_path)
 			except Exception as e:
 				return self._error_response(f"Failed to stage updater: {str(e)}")
 
 			# Launch the updater copy in updater mode and exit this process to release lock
-			args = [updater_path, "--updater", temp_exe_path, current_exe, "relaunch"]
+			ready_path = os.path.join(self._data_dir, 'updater.ready')
+			self._remove_quietly(ready_path)
+			args = [updater_path, "--updater", temp_exe_path, current_exe, "relaunch", ready_path]
 			subprocess.Popen(args, shell=False, creationflags=subprocess.DETACHED_PROCESS)
-			# Give it a moment to start, then exit hard
-			time.sleep(0.2)
+			# Wait (up to 0.5s) for the updater to report it's running, then exit hard
+			for _ in range(50):
+				if os.path.exists(ready_path):
+					break
+				time.sleep(0.01)
 			os._exit(0)
 			
-		except requests.RequestException as e:
+		except (requests.RequestException, urllib3.exceptions.HTTPError) as e:
 			return self._error_response(f"Failed to download update: Network error - {str(e)}")
 		except Exception as e:
 			return self._error_response(f"Failed to install update: {str(e)}")
 
+# PyInstaller creates a temp folder and stores path in _MEIPASS; fall back to the working directory in dev
+_MEIPASS_BASE = getattr(sys, '_MEIPASS', None) or os.path.abspath(".")
+
 def get_resource_path(relative_path):
 	"""Get absolute path to resource, works for dev and for PyInstaller"""
+	return os.path.join(_MEIPASS_BASE, relative_path)
+
+def get_html_file_url(html_file_path):
+	"""Return the file URL for the HTML file"""
+	return f'file:///{html_file_path.replace(os.sep, "/")}'
+
+def _fast_copy(src, dst):
+	"""Copy src to dst with its metadata, letting the OS do the copy"""
+	if sys.platform == 'win32':
+		# CopyFileW copies in the kernel (and keeps timestamps and attributes) instead of looping through Python buffers
+		if not ctypes.windll.kernel32.CopyFileW(ctypes.c_wchar_p(src), ctypes.c_wchar_p(dst), False):
+			raise ctypes.WinError()
+	else:
+		# shutil.copy2 already copies with os.sendfile on Linux and fcopyfile on macOS
+		import shutil
+		shutil.copy2(src, dst)
+
+# Win32 ReplaceFileW/MoveFileExW/MessageBoxW flags and the errors that mean the target is still in use
+_REPLACEFILE_WRITE_THROUGH = 0x1
+_REPLACEFILE_IGNORE_MERGE_ERRORS = 0x2
+_MOVEFILE_REPLACE_EXISTING = 0x1
+_MOVEFILE_DELAY_UNTIL_REBOOT = 0x4
+_ERROR_SHARING_VIOLATION = 32
+_ERROR_UNABLE_TO_REMOVE_REPLACED = 1175
+_MB_ICONWARNING = 0x30
+
+def _replace_exe(new_exe, target_exe):
+	"""Move new_exe over target_exe; returns False if the target is still locked, so the caller can retry"""
+	if sys.platform == 'win32':
+		# ReplaceFileW swaps the file in with one call (keeping the target's attributes and ACLs)
+		kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+		flags = _REPLACEFILE_WRITE_THROUGH | _REPLACEFILE_IGNORE_MERGE_ERRORS
+		if kernel32.ReplaceFileW(target_exe, new_exe, None, flags, None, None):
+			return True
+		if ctypes.get_last_error() in (_ERROR_SHARING_VIOLATION, _ERROR_UNABLE_TO_REMOVE_REPLACED):
+			return False
+		# Anything else (target missing, different volume) falls through to the portable path
 	try:
-		# PyInstaller creates a temp folder and stores path in _MEIPASS
-		base_path = sys._MEIPASS
+		try:
+			os.replace(new_exe, target_exe)
+		except OSError:
+			_fast_copy(new_exe, target_exe)
+			try:
+				os.remove(new_exe)
+			except Exception:
+				pass
+		return True
 	except Exception:
-		base_path = os.path.abspath(".")
-	return os.path.join(base_path, relative_path)
+		return False
 
-def get_data_path():
-	"""Get writable data directory for the database"""
-	if getattr(sys, 'frozen', False):
-		# Running as compiled executable
-		# Use user's AppData directory for writable database
-		import tempfile
-		app_data = os.path.join(os.environ.get('APPDATA', tempfile.gettempdir()), 'InventorySystem')
-		os.makedirs(app_data, exist_ok=True)
-		return app_data
+def _show_update_message(message):
+	"""Tell the user about an update that didn't go through (the updater has no window of its own)"""
+	if sys.platform == 'win32':
+		ctypes.windll.user32.MessageBoxW(None, message, "Bad-Bandit IMS Update", _MB_ICONWARNING)
 	else:
-		# Running as Python script
-		return os.path.join(os.path.dirname(__file__), "data")
+		print(message, file=sys.stderr)
 
-def get_html_file_url(html_file_path):
-	"""Return the file URL for the HTML file"""
-	return f'file:///{html_file_path.replace(os.sep, "/")}'
+def _finish_update_later(new_exe, target_exe):
+	"""The target stayed locked: have Windows swap the new exe in at next boot, or tell the user it failed.
+	new_exe is left where it is either way."""
+	if sys.platform == 'win32':
+		flags = _MOVEFILE_REPLACE_EXISTING | _MOVEFILE_DELAY_UNTIL_REBOOT
+		# Scheduling a boot-time move needs admin rights, so this fails for most per-user installs
+		if ctypes.WinDLL('kernel32', use_last_error=True).MoveFileExW(new_exe, target_exe, flags):
+			_show_update_message("The update will finish the next time Windows restarts.")
+			return
+		error = ctypes.WinError(ctypes.get_last_error())
+	else:
+		error = "the application file is still in use"
+	_show_update_message(f"The update could not be installed ({error}).\n\nThe downloaded version was kept at:\n{new_exe}")
 
 def main():
 	# Initialize API
@@ -384,7 +694,7 @@ def main():
 	# Get the HTML file URL
 	html_url = get_html_file_url(html_file)
 	
-	webview.create_window(
+	api._window = webview.create_window(
 		"Bad-Bandit IMS",
 		url=html_url,
 		width=1200,
@@ -397,28 +707,34 @@ def main():
 	webview.start()
 
 if __name__ == "__main__":
+	# Frozen builds re-launch this executable for barcode PDF worker processes
+	multiprocessing.freeze_support()
+	
 	# If started in updater mode, perform replacement and exit
 	if len(sys.argv) >= 5 and sys.argv[1] == "--updater":
+		import subprocess
+		
 		new_exe = sys.argv[2]
 		target_exe = sys.argv[3]
 		relaunch = (sys.argv[4].lower() == 'relaunch') if len(sys.argv) > 4 else False
-
-		# Retry replacing until the original process releases the file
-		for _ in range(30):
+		
+		# Tell the app that launched us it can exit now
+		if len(sys.argv) > 5:
 			try:
-				try:
-					os.replace(new_exe, target_exe)
-				except OSError:
-					shutil.copy2(new_exe, target_exe)
-					try:
-						os.remove(new_exe)
-					except Exception:
-						pass
+				open(sys.argv[5], 'w').close()
+			except OSError:
+				pass
+
+		# Retry replacing until the original process releases the file, polling quickly at first
+		# (it exits right after seeing the ready file) and backing off to 0.5s, for about 15s in all
+		delay = 0.05
+		deadline = time.monotonic() + 15
+		while not _replace_exe(new_exe, target_exe):
+			if time.monotonic() >= deadline:
+				_finish_update_later(new_exe, target_exe)
 				break
-			except PermissionError:
-				time.sleep(0.5)
-			except Exception:
-				time.sleep(0.5)
+			time.sleep(delay)
+			delay = min(delay * 2, 0.5)
 
 		if relaunch:
 			try:
@@ -427,5 +743,11 @@ if __name__ == "__main__":
 				pass
 		sys.exit(0)
 
-	# Normal app start
+	# Normal app start; clear out the exe an in-place update moved aside (still locked if it's shutting down)
+	if getattr(sys, 'frozen', False):
+		try:
+			os.remove(sys.executable + '.old')
+		except OSError:
+			pass
+	
 	main()
\ No newline at end of file
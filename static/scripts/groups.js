@@ -430,6 +430,9 @@ function createProductRowSync(product, index, animate = true) {
     }
     row.style.cursor = 'pointer';
     row.dataset.productId = product.id;
+    if (product.has_flagged_ingredients) {
+        row.classList.add(INVENTORY_CONFIG.CSS_CLASSES.FLAGGED_PRODUCT);
+    }
     
     const dateMixed = formatDate(product.date_mixed);
     const totalCost = formatCurrency(product.total_cost);
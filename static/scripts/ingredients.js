@@ -459,7 +459,8 @@ function createAllIngredientItemHTML(ingredient, isFlagged, flaggedClass, flagge
             </div>
             <div class="ingredient-barcode-display">
                 <div class="barcode-display-container clickable-barcode" 
-                     onclick="printBarcode('${ingredient.barcode_id}')" 
+                     data-ingredient-name="${ingredient.name.replace(/"/g, '&quot;')}"
+                     onclick="printBarcode('${ingredient.barcode_id}', this.dataset.ingredientName)" 
                      title="Print Barcode">
                     <div class="barcode-display">
                         ${barcodeDisplay}
@@ -76,6 +76,64 @@ async function loadAndDisplayVersion() {
     }
 }
 
+/**
+ * Show progress of a background update download on the version button.
+ * Call before starting the download: the backend calls window.onDownloadProgress / window.onUpdateError
+ * with the download's token, and a fast failure can arrive before the API call returns that token.
+ * Returns { start(token), fail(message) }; start() also polls get_task_status in case a callback was missed.
+ */
+function showUpdateDownloadProgress(versionButton) {
+    versionButton.onclick = null;
+    versionButton.style.cursor = 'default';
+    versionButton.title = 'Downloading update...';
+    
+    // token stays null until the API call returns; until then any callback belongs to this download
+    const download = { token: null, finished: false, pollTimer: null };
+    const isThisDownload = (downloadToken) => download.token === null || downloadToken === download.token;
+    
+    function fail(message) {
+        if (download.finished) return;
+        download.finished = true;
+        clearInterval(download.pollTimer);
+        // Restore the button so the user can retry
+        loadAndDisplayVersion();
+        const msg = `Update failed: ${message}`;
+        if (window.notifyError) {
+            window.notifyError(msg);
+        } else {
+            alert(msg);
+        }
+    }
+    
+    window.onDownloadProgress = function(downloadToken, downloaded, total) {
+        if (download.finished || !isThisDownload(downloadToken)) return;
+        versionButton.textContent = total ? `${Math.floor(downloaded * 100 / total)}%` : `${(downloaded / 1048576).toFixed(1)} MB`;
+    };
+    
+    window.onUpdateError = function(downloadToken, message) {
+        if (isThisDownload(downloadToken)) fail(message);
+    };
+    
+    function start(token) {
+        download.token = token;
+        // On success the app exits, so the only outcome to watch for is a failure
+        download.pollTimer = setInterval(async function() {
+            try {
+                const status = await pywebview.api.get_task_status(token);
+                if (!status.success || status.state === 'error') {
+                    fail(status.message);
+                } else if (status.state === 'done' && status.result && !status.result.success) {
+                    fail(status.result.message);
+                }
+            } catch (error) {
+                console.error('Error polling update status:', error);
+            }
+        }, 2000);
+    }
+    
+    return { start, fail };
+}
+
 /**
  * Check for updates and style the version button if updates are available
  */
@@ -93,28 +151,19 @@ async function checkForUpdatesAndStyleButton() {
                     // Add click handler for update installation
                     versionButton.onclick = async function() {
                         if (confirm(`A new version (v${response.latest_version}) is available. Would you like to download and install it now?\n\nThe application will restart automatically after installation.`)) {
+                            // Install the progress/error callbacks first so an early failure isn't lost
+                            const download = showUpdateDownloadProgress(versionButton);
                             try {
                                 const updateResponse = await pywebview.api.download_and_install_update();
                                 if (updateResponse.success) {
-                                    alert(updateResponse.message);
-                                    // Close the application - the batch file will restart it
-                                    window.close();
+                                    // The download runs in the background; the app restarts itself when it finishes
+                                    download.start(updateResponse.token);
                                 } else {
-                                    const msg = `Update failed: ${updateResponse.message}`;
-                                    if (window.notifyError) {
-                                        window.notifyError(msg);
-                                    } else {
-                                        alert(msg);
-                                    }
+                                    download.fail(updateResponse.message);
                                 }
                             } catch (error) {
                                 console.error('Error during update:', error);
-                                const msg = 'Failed to download update. Please try again later.';
-                                if (window.notifyError) {
-                                    window.notifyError(msg);
-                                } else {
-                                    alert(msg);
-                                }
+                                download.fail('Failed to download update. Please try again later.');
                             }
                         }
                     };
@@ -1411,7 +1411,8 @@ function displayIngredientSuccess(ingredient, barcodeId) {
                         <div class="barcode-text">${barcodeId}</div>
                     </div>
                     <div style="margin-top: 10px;">
-                        <button onclick="printBarcode('${barcodeId}')" class="print-button">
+                        <button data-ingredient-name="${ingredient.name.replace(/"/g, '&quot;')}"
+                                onclick="printBarcode('${barcodeId}', this.dataset.ingredientName)" class="print-button">
                             🖨️ Print Barcode
                         </button>
                     </div>
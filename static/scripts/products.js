@@ -466,9 +466,11 @@ async function createProductRow(product, index) {
         </td>
     `;
     
-    // Check if product has flagged ingredients
+    // Check if product has flagged ingredients (product listings already include the flag)
     try {
-        const hasFlaggedIngredients = await pywebview.api.check_product_has_flagged_ingredients(product.id);
+        const hasFlaggedIngredients = product.has_flagged_ingredients !== undefined
+            ? product.has_flagged_ingredients
+            : await pywebview.api.check_product_has_flagged_ingredients(product.id);
         if (hasFlaggedIngredients) {
             row.classList.add(INVENTORY_CONFIG.CSS_CLASSES.FLAGGED_PRODUCT);
         }
@@ -548,21 +550,25 @@ window.loadProductIngredients = loadProductIngredients;
 async function updateProductTableFlaggedStatus() {
     const rows = document.querySelectorAll('#productsTableBody tr');
     
-    for (const row of rows) {
-        const productId = row.dataset.productId;
-        if (productId) {
-            try {
-                const hasFlaggedIngredients = await pywebview.api.check_product_has_flagged_ingredients(parseInt(productId));
-                
-                if (hasFlaggedIngredients) {
+    try {
+        // One call returns the flagged status of every product
+        const productsData = await pywebview.api.get_products_data();
+        const flaggedIds = new Set(
+            productsData.filter(product => product.has_flagged_ingredients).map(product => product.id)
+        );
+        
+        for (const row of rows) {
+            const productId = row.dataset.productId;
+            if (productId) {
+                if (flaggedIds.has(parseInt(productId))) {
                     row.classList.add(INVENTORY_CONFIG.CSS_CLASSES.FLAGGED_PRODUCT);
                 } else {
                     row.classList.remove(INVENTORY_CONFIG.CSS_CLASSES.FLAGGED_PRODUCT);
                 }
-            } catch (error) {
-                console.error('Error checking product flagged status:', error);
             }
         }
+    } catch (error) {
+        console.error('Error checking product flagged status:', error);
     }
 }
 
@@ -310,13 +310,14 @@ function createErrorHTML(message, retryFunction = null) {
 /**
  * Print barcode by generating a PDF
  * @param {string} barcodeId - Barcode ID to print
+ * @param {string} [ingredientName] - Label name, if already known (skips the backend lookup)
  */
-async function printBarcode(barcodeId) {
+async function printBarcode(barcodeId, ingredientName = null) {
     console.log('Print barcode requested for:', barcodeId);
     
     try {
         // Call backend to generate PDF - no visual feedback needed
-        const result = await pywebview.api.generate_barcode_pdf(barcodeId);
+        const result = await pywebview.api.generate_barcode_pdf(barcodeId, ingredientName);
         
         if (result.success) {
             console.log('Barcode PDF generated successfully:', result.pdf_path);
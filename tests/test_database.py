@@ -0,0 +1,211 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+import database
+
+
+class DeleteProductCascadeTest(unittest.TestCase):
+	"""delete_product relies on ON DELETE CASCADE to clean up the product's link rows"""
+	
+	def setUp(self):
+		self.data_dir = tempfile.mkdtemp()
+		self._get_data_path = database.get_data_path
+		database.get_data_path = lambda: self.data_dir
+		self.db = database.DatabaseManager()
+	
+	def tearDown(self):
+		self.db._conn.close()
+		database.get_data_path = self._get_data_path
+		shutil.rmtree(self.data_dir, ignore_errors=True)
+	
+	def _count(self, sql, params):
+		with self.db._get_db_connection() as conn:
+			return conn.execute(sql, params).fetchone()['n']
+	
+	def test_delete_product_cascades_to_link_rows(self):
+		ingredient_id = self.db.create_ingredient({'name': 'Sugar', 'cost': 2})['ingredient']['id']
+		product_id = self.db.create_product({
+			'product_name': 'Syrup',
+			'mixed_date': '2024-01-01',
+			'amount': 1,
+			'ingredients': [{'ingredient_id': ingredient_id, 'quantity': 3}]
+		})['product_id']
+		group_id = self.db.create_group('Batch A')['group_id']
+		self.db.add_product_to_group(group_id, product_id)
+		parameter_id = self.db.create_group_parameter(group_id, 'pH')['parameter_id']
+		self.db.set_product_group_parameter_values(product_id, [{'parameter_id': parameter_id, 'value': '4.5'}])
+		
+		self.assertEqual(self._count('SELECT COUNT(*) AS n FROM product_ingredients WHERE product_id = ?', (product_id,)), 1)
+		self.assertEqual(self._count('SELECT COUNT(*) AS n FROM group_products WHERE product_id = ?', (product_id,)), 1)
+		self.assertEqual(self._count('SELECT COUNT(*) AS n FROM product_group_parameter_values WHERE product_id = ?', (product_id,)), 1)
+		
+		self.assertTrue(self.db.delete_product(product_id)['success'])
+		
+		self.assertEqual(self._count('SELECT COUNT(*) AS n FROM product_ingredients WHERE product_id = ?', (product_id,)), 0)
+		self.assertEqual(self._count('SELECT COUNT(*) AS n FROM group_products WHERE product_id = ?', (product_id,)), 0)
+		self.assertEqual(self._count('SELECT COUNT(*) AS n FROM product_group_parameter_values WHERE product_id = ?', (product_id,)), 0)
+		# Only the product's links go; the ingredient and the group stay
+		self.assertEqual(self._count('SELECT COUNT(*) AS n FROM ingredients WHERE id = ?', (ingredient_id,)), 1)
+		self.assertEqual(self._count('SELECT COUNT(*) AS n FROM groups WHERE id = ?', (group_id,)), 1)
+
+
+class TransactionTest(unittest.TestCase):
+	"""_transaction commits on success and rolls back on error without masking it"""
+	
+	def setUp(self):
+		self.conn = sqlite3.connect(':memory:', isolation_level=None)
+		self.conn.execute('CREATE TABLE t (x INTEGER)')
+	
+	def tearDown(self):
+		self.conn.close()
+	
+	def test_error_rolls_back(self):
+		with self.assertRaises(ValueError):
+			with database._transaction(self.conn):
+				self.conn.execute('INSERT INTO t VALUES (1)')
+				raise ValueError
+		self.assertFalse(self.conn.in_transaction)
+		self.assertEqual(self.conn.execute('SELECT COUNT(*) FROM t').fetchone()[0], 0)
+	
+	def test_error_after_sqlite_rolled_back_is_not_masked(self):
+		# As when SQLite aborts the transaction itself (e.g. SQLITE_FULL) before the error reaches us
+		with self.assertRaises(ValueError):
+			with database._transaction(self.conn, "BEGIN IMMEDIATE"):
+				self.conn.execute('ROLLBACK')
+				raise ValueError
+		self.assertFalse(self.conn.in_transaction)
+
+
+# Tables as the original (pre-STRICT) code created them, with a little data in each
+_BASELINE_SCHEMA = '''
+	CREATE TABLE ingredients (id INTEGER PRIMARY KEY AUTOINCREMENT, barcode_id TEXT UNIQUE NOT NULL, name TEXT NOT NULL, unit_cost REAL DEFAULT 0.0, purchase_date DATE, expiration_date DATE, supplier TEXT, is_flagged INTEGER DEFAULT 0, last_updated DATETIME DEFAULT CURRENT_TIMESTAMP);
+	CREATE TABLE products (id INTEGER PRIMARY KEY AUTOINCREMENT, barcode_id TEXT UNIQUE NOT NULL, product_name TEXT NOT NULL, batch_number TEXT, date_mixed DATE NOT NULL, total_quantity REAL DEFAULT 0.0, total_cost REAL DEFAULT 0.0, amount INTEGER DEFAULT 0, notes TEXT, last_updated DATETIME DEFAULT CURRENT_TIMESTAMP);
+	CREATE TABLE product_ingredients (id INTEGER PRIMARY KEY AUTOINCREMENT, product_id INTEGER NOT NULL, ingredient_id INTEGER NOT NULL, quantity_used REAL NOT NULL, cost_per_unit REAL DEFAULT 0.0, FOREIGN KEY (product_id) REFERENCES products (id) ON DELETE CASCADE, FOREIGN KEY (ingredient_id) REFERENCES ingredients (id) ON DELETE CASCADE, UNIQUE(product_id, ingredient_id));
+	CREATE TABLE groups (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, display_order INTEGER DEFAULT 0, is_collapsed INTEGER DEFAULT 0, created_at DATETIME DEFAULT CURRENT_TIMESTAMP, last_updated DATETIME DEFAULT CURRENT_TIMESTAMP);
+	CREATE TABLE group_products (id INTEGER PRIMARY KEY AUTOINCREMENT, group_id INTEGER NOT NULL, product_id INTEGER NOT NULL, FOREIGN KEY (group_id) REFERENCES groups (id) ON DELETE CASCADE, FOREIGN KEY (product_id) REFERENCES products (id) ON DELETE CASCADE, UNIQUE(product_id));
+	CREATE TABLE group_parameters (id INTEGER PRIMARY KEY AUTOINCREMENT, group_id INTEGER NOT NULL, name TEXT NOT NULL, display_order INTEGER DEFAULT 0, created_at DATETIME DEFAULT CURRENT_TIMESTAMP, FOREIGN KEY (group_id) REFERENCES groups (id) ON DELETE CASCADE, UNIQUE(group_id, name));
+	CREATE TABLE product_group_parameter_values (id INTEGER PRIMARY KEY AUTOINCREMENT, product_id INTEGER NOT NULL, group_parameter_id INTEGER NOT NULL, value TEXT, last_updated DATETIME DEFAULT CURRENT_TIMESTAMP, FOREIGN KEY (product_id) REFERENCES products (id) ON DELETE CASCADE, FOREIGN KEY (group_parameter_id) REFERENCES group_parameters (id) ON DELETE CASCADE, UNIQUE(product_id, group_parameter_id));
+	CREATE TABLE inventory_events (id INTEGER PRIMARY KEY AUTOINCREMENT, product_id INTEGER NOT NULL, delta INTEGER NOT NULL, event_title TEXT, event_date DATE DEFAULT CURRENT_DATE, created_at DATETIME DEFAULT CURRENT_TIMESTAMP);
+	
+	INSERT INTO ingredients (barcode_id, name, unit_cost, purchase_date) VALUES ('978000000001', 'Sugar', 2.0, '2024-01-01');
+	INSERT INTO ingredients (barcode_id, name, unit_cost, purchase_date) VALUES ('978000000002', 'Salt', 1.0, '2024-01-01');
+	INSERT INTO products (barcode_id, product_name, batch_number, date_mixed, total_quantity, total_cost, amount) VALUES ('PRD0000000001', 'Syrup', 'BATCH1', '2024-01-02', 3, 6, 1);
+	INSERT INTO products (barcode_id, product_name, batch_number, date_mixed, total_quantity, total_cost, amount) VALUES ('PRD0000000002', 'Brine', 'BATCH2', '2024-01-03', 0, 0, 1);
+	INSERT INTO product_ingredients (product_id, ingredient_id, quantity_used, cost_per_unit) VALUES (1, 1, 3, 2.0);
+	INSERT INTO groups (name) VALUES ('Batch A');
+	INSERT INTO group_products (group_id, product_id) VALUES (1, 1);
+	INSERT INTO group_parameters (group_id, name) VALUES (1, 'pH');
+	INSERT INTO product_group_parameter_values (product_id, group_parameter_id, value) VALUES (1, 1, '4.5');
+'''
+
+
+class UpgradeFromBaselineTest(unittest.TestCase):
+	"""Opening a database created by the original schema migrates it without losing data or constraints"""
+	
+	# Extra statements run against the baseline database before it's opened
+	legacy_sql = ''
+	
+	def setUp(self):
+		self.data_dir = tempfile.mkdtemp()
+		self._get_data_path = database.get_data_path
+		database.get_data_path = lambda: self.data_dir
+		conn = sqlite3.connect(os.path.join(self.data_dir, 'inventory.db'))
+		conn.executescript(_BASELINE_SCHEMA + self.legacy_sql)
+		conn.close()
+		self.db = database.DatabaseManager()
+	
+	def tearDown(self):
+		self.db._conn.close()
+		database.get_data_path = self._get_data_path
+		shutil.rmtree(self.data_dir, ignore_errors=True)
+	
+	def _query(self, sql, params=()):
+		with self.db._get_db_connection() as conn:
+			return conn.execute(sql, params).fetchall()
+	
+	def test_rebuilt_tables_keep_foreign_keys_and_unique_constraints(self):
+		expected_parents = {
+			'product_ingredients': {'products', 'ingredients'},
+			'group_products': {'groups', 'products'},
+			'group_parameters': {'groups'},
+			'product_group_parameter_values': {'products', 'group_parameters'},
+		}
+		for table_name, parents in expected_parents.items():
+			foreign_keys = self._query(f'PRAGMA foreign_key_list({table_name})')
+			self.assertEqual({fk['table'] for fk in foreign_keys}, parents, table_name)
+			self.assertTrue(all(fk['on_delete'] == 'CASCADE' for fk in foreign_keys), table_name)
+			unique_indexes = [index for index in self._query(f'PRAGMA index_list({table_name})') if index['unique']]
+			self.assertTrue(unique_indexes, table_name)
+		
+		sql = self._query("SELECT sql FROM sqlite_master WHERE name = 'group_products'")[0]['sql']
+		self.assertTrue(sql.rstrip().endswith('STRICT'))
+		self.assertEqual(self._query('PRAGMA foreign_key_check'), [])
+	
+	def test_rows_are_carried_over(self):
+		self.assertEqual([row['name'] for row in self._query('SELECT name FROM ingredients WHERE id <= 2 ORDER BY id')], ['Sugar', 'Salt'])
+		self.assertEqual(len(self._query('SELECT id FROM products WHERE id <= 2')), 2)
+		self.assertEqual(len(self._query('SELECT id FROM product_ingredients WHERE product_id = 1')), 1)
+		self.assertEqual(self._query('SELECT group_id, product_id FROM group_products'), [{'group_id': 1, 'product_id': 1}])
+		self.assertEqual(self._query('SELECT value FROM product_group_parameter_values'), [{'value': '4.5'}])
+
+	
+	def test_add_product_to_group_moves_membership(self):
+		new_group_id = self.db.create_group('Batch B')['group_id']
+		
+		self.assertTrue(self.db.add_product_to_group(new_group_id, 1)['success'])
+		self.assertTrue(self.db.add_product_to_group(new_group_id, 2)['success'])
+		
+		memberships = self._query('SELECT group_id, product_id FROM group_products ORDER BY product_id')
+		self.assertEqual(memberships, [{'group_id': new_group_id, 'product_id': 1}, {'group_id': new_group_id, 'product_id': 2}])
+		# Moving to another group drops the values of the old group's parameters
+		self.assertEqual(self._query('SELECT id FROM product_group_parameter_values WHERE product_id = 1'), [])
+
+	
+	def test_deletes_cascade_on_upgraded_database(self):
+		self.assertTrue(self.db.delete_product(1)['success'])
+		self.assertEqual(self._query('SELECT id FROM product_ingredients WHERE product_id = 1'), [])
+		self.assertEqual(self._query('SELECT id FROM group_products WHERE product_id = 1'), [])
+		self.assertEqual(self._query('SELECT id FROM product_group_parameter_values WHERE product_id = 1'), [])
+		
+		self.db.create_product({
+			'product_name': 'Syrup 2',
+			'mixed_date': '2024-02-01',
+			'amount': 1,
+			'ingredients': [{'ingredient_id': 1, 'quantity': 1}]
+		})
+		self.assertTrue(self.db.delete_ingredient(1)['success'])
+		self.assertEqual(self._query('SELECT id FROM product_ingredients WHERE ingredient_id = 1'), [])
+		
+		self.db.add_product_to_group(1, 2)
+		self.assertTrue(self.db.delete_group(1)['success'])
+		self.assertEqual(self._query('SELECT id FROM group_products WHERE group_id = 1'), [])
+		self.assertEqual(self._query('SELECT id FROM group_parameters WHERE group_id = 1'), [])
+		self.assertEqual(self._query('PRAGMA foreign_key_check'), [])
+
+
+
+class UpgradeLegacyValuesTest(UpgradeFromBaselineTest):
+	"""Values the old untyped tables accepted but STRICT columns reject are converted, not fatal"""
+	
+	legacy_sql = '''
+		INSERT INTO ingredients (barcode_id, name, unit_cost, is_flagged) VALUES ('978000000003', 'Pepper', '', '1');
+		INSERT INTO ingredients (barcode_id, name, unit_cost, is_flagged) VALUES ('978000000004', 'Clove', ' 2.5 ', NULL);
+		INSERT INTO products (barcode_id, product_name, date_mixed, amount) VALUES ('PRD0000000003', 'Tonic', '2024-01-04', '3.0');
+		INSERT INTO product_ingredients (product_id, ingredient_id, quantity_used) VALUES (3, 3, 'n/a');
+	'''
+	
+	def test_legacy_values_are_converted(self):
+		rows = self._query("SELECT name, unit_cost, is_flagged FROM ingredients WHERE name IN ('Pepper', 'Clove') ORDER BY id")
+		self.assertEqual(rows, [
+			{'name': 'Pepper', 'unit_cost': 0.0, 'is_flagged': 1},
+			{'name': 'Clove', 'unit_cost': 2.5, 'is_flagged': None}
+		])
+		self.assertEqual(self._query("SELECT amount FROM products WHERE product_name = 'Tonic'"), [{'amount': 3}])
+		self.assertEqual(self._query('SELECT quantity_used FROM product_ingredients WHERE product_id = 3'), [{'quantity_used': 0.0}])
+
+
+if __name__ == '__main__':
+	unittest.main()